@@ -0,0 +1,70 @@
+"""
+Blit throughput of images loaded as they are and loaded through the image cache,
+which converts them to the display pixel format.
+
+Run it in the root of the repository:
+
+$ python benchmarks/blit.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from easyplayer.core.cache import image_cache
+
+BLITS = 20000
+
+
+def _make_images(directory: str):
+    """
+    Save an opaque and a translucent test image.
+
+    :param directory: Save directory.
+    :return: Paths of the images.
+    """
+    opaque = pygame.Surface((64, 64), depth=24)
+    opaque.fill((30, 120, 200))
+    translucent = pygame.Surface((64, 64), pygame.SRCALPHA)
+    translucent.fill((200, 30, 120, 128))
+    paths = os.path.join(directory, 'opaque.png'), os.path.join(directory, 'translucent.png')
+    pygame.image.save(opaque, paths[0])
+    pygame.image.save(translucent, paths[1])
+    return paths
+
+
+def _blits_per_second(screen: pygame.Surface, image: pygame.Surface):
+    """
+    Measure the blit throughput of an image.
+
+    :param screen: Target surface.
+    :param image: Source image.
+    :return: Blits per second.
+    """
+    start = time.perf_counter()
+    for i in range(BLITS):
+        screen.blit(image, (i % 500, i % 400))
+    return BLITS / (time.perf_counter() - start)
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((640, 480))
+    with tempfile.TemporaryDirectory() as directory:
+        for path in _make_images(directory):
+            before = _blits_per_second(screen, pygame.image.load(path))
+            after = _blits_per_second(screen, image_cache.load(path))
+            print(f'{os.path.basename(path):16} before: {before:10.0f} blits/s  '
+                  f'after: {after:10.0f} blits/s  ({after / before:.1f}x)')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
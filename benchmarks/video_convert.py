@@ -0,0 +1,103 @@
+"""
+Frames per second converted from OpenCV BGR frames to pygame surfaces and blitted
+onto a surface in the display pixel format, at the decoded size and scaled down,
+and the time of blitting a kept frame again, as video2images frames are on every loop.
+
+Paths:
+before: the old transpose and make_surface path.
+streamed: FrameConverter wrapping the buffer, as VideoStream does, the blit converts the 24-bit frame.
+kept: FrameConverter then Surface.convert once, as video2images does.
+
+Run it in the root of the repository:
+
+$ python benchmarks/video_convert.py
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+import pygame
+
+from easyplayer.core.widgets.video.clip import FrameConverter
+
+FRAMES = 120
+BLITS = 500
+SIZE = (1920, 1080)
+SCALED = (640, 360)
+
+
+def _old(frame: np.ndarray, size=None):
+    """
+    Conversion before FrameConverter: transpose, two flips, make_surface, then pygame scaling.
+
+    :param frame: BGR frame.
+    :param size: Scaled size.
+    :return: The surface.
+    """
+    frame = np.fliplr(np.fliplr(cv2.transpose(frame)))
+    surface = pygame.surfarray.make_surface(frame)
+    if size:
+        surface = pygame.transform.scale(surface, size)
+    return surface
+
+
+def _frames_per_second(convert, frames, target: pygame.Surface):
+    """
+    Measure the throughput of converting a frame and blitting it once.
+
+    :param convert: Conversion function.
+    :param frames: BGR frames.
+    :param target: Surface in the display pixel format.
+    :return: Frames per second.
+    """
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        target.blit(convert(frames[i % len(frames)]), (0, 0))
+    return FRAMES / (time.perf_counter() - start)
+
+
+def _blit_ms(surface: pygame.Surface, target: pygame.Surface):
+    """
+    Measure the time of blitting a surface.
+
+    :param surface: The surface.
+    :param target: Surface in the display pixel format.
+    :return: Milliseconds per blit.
+    """
+    start = time.perf_counter()
+    for _ in range(BLITS):
+        target.blit(surface, (0, 0))
+    return (time.perf_counter() - start) / BLITS * 1000
+
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (SIZE[1], SIZE[0], 3), dtype=np.uint8) for _ in range(4)]
+    for size in (None, SCALED):
+        label = f'{SIZE[0]}x{SIZE[1]}' + (f' -> {size[0]}x{size[1]}' if size else '')
+        target = pygame.Surface(size or SIZE).convert()
+        converter = FrameConverter(size)
+        before = _frames_per_second(lambda frame: _old(frame, size), frames, target)
+        streamed = _frames_per_second(converter.convert, frames, target)
+        reused = _frames_per_second(FrameConverter(size, slots=4).convert, frames, target)
+        kept = _frames_per_second(lambda frame: converter.convert(frame).convert(), frames, target)
+        print(f'{label:22} convert and blit  before: {before:6.1f} fps  streamed: {streamed:6.1f} fps '
+              f'({streamed / before:.1f}x)  reused surfaces: {reused:6.1f} fps ({reused / before:.1f}x)  '
+              f'kept: {kept:6.1f} fps ({kept / before:.1f}x)')
+        wrapped = converter.convert(frames[0])
+        print(f'{"":22} blit again        streamed: {_blit_ms(wrapped, target):.2f} ms  '
+              f'kept: {_blit_ms(wrapped.convert(), target):.2f} ms')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
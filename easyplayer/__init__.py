@@ -28,6 +28,7 @@ __all__ = [
     'Camera',
     'ColorModes',
     'keys',
+    'Input',
     'styles',
     'Screenshot',
     'save_screenshot',
@@ -51,6 +52,10 @@ __all__ = [
     'VariableManager',
     'Screencap',
     'CloneManager',
+    'SpatialHash',
+    'FrameProfiler',
+    'EventRecorder',
+    'EventReplay',
     'Bar',
     'LBCoordinate',
     'LTCoordinate',
@@ -63,6 +68,10 @@ __all__ = [
     'speak',
     'SpeakEngine',
     'ScreencapEncodings',
+    'image_cache',
+    'rotation_cache',
+    'text_cache',
+    'font_registry',
     'error'
 ]
 
@@ -105,6 +114,9 @@ except error:
     Camera = ColorModes = None
 from easyplayer.core.widgets.entry.entry import Entry
 from easyplayer.core.event import keys
+from easyplayer.core.input import Input
+from easyplayer.core.cache import image_cache, rotation_cache
+from easyplayer.core.text import text_cache, font_registry
 import easyplayer.core.styles as styles
 
 from easyplayer.utils.screenshot import Screenshot, save_screenshot
@@ -114,6 +126,9 @@ from easyplayer.utils.timer import Timer, sleep
 from easyplayer.utils.record import recorder
 from easyplayer.utils.color import Color
 from easyplayer.utils.managers import VariableManager, CloneManager
+from easyplayer.utils.spatial import SpatialHash
+from easyplayer.utils.profiler import FrameProfiler
+from easyplayer.utils.replay import EventRecorder, EventReplay
 from easyplayer.utils.coordinate import LTCoordinate, LBCoordinate, NormalCoordinate, parse_coordinate
 
 from easyplayer.utils import cs
@@ -0,0 +1,337 @@
+"""
+Easy Player image cache.
+
+Images are loaded from disk once, converted to the display pixel format
+and shared by all widgets that use them.
+Rotated images are cached per image and quantized angle,
+and collision masks per image.
+
+Such as:
+
+>>> import easyplayer as ep
+>>> ep.image_cache.set_max_memory(64 * 1024 * 1024)  # 64 MiB
+>>> print(ep.image_cache.hits, ep.image_cache.misses)
+"""
+
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple, Hashable
+from weakref import WeakValueDictionary, WeakKeyDictionary
+
+import pygame
+
+__all__ = ['ImageCache', 'RotationCache', 'MaskCache', 'image_cache', 'rotation_cache', 'mask_cache']
+
+
+def _display_format():
+    """
+    Get the pixel format of the display surface.
+
+    :return: Bits and masks of the display surface, None if there is no display surface.
+    """
+    display = pygame.display.get_surface()
+    if display is None:
+        return None
+    return display.get_bitsize(), display.get_masks()
+
+
+def _convert(surface: pygame.Surface, alpha: bool = False):
+    """
+    Convert a surface to the display pixel format, so that blitting it is fast.
+
+    Surfaces with per-pixel alpha keep their alpha channel.
+
+    :param surface: The surface.
+    :param alpha: Convert to RGBA even without per-pixel alpha.
+    :return: The converted surface, or the surface itself when there is no display surface.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    if alpha or surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+def _surface_memory(surface: pygame.Surface):
+    """
+    Get the memory used by the pixels of a surface.
+
+    :param surface: The surface.
+    :return: Number of bytes.
+    """
+    return surface.get_pitch() * surface.get_height()
+
+
+class ImageCache(object):
+    def __init__(self, max_memory: int = 128 * 1024 * 1024):
+        """
+        Easy Player image cache.
+
+        Loaded surfaces are converted to the display pixel format once and keyed by (path, size, convert mode).
+        They are shared, so do not draw on them, copy them first.
+        The least recently used surfaces are dropped when the cache uses more than max_memory bytes,
+        but a dropped surface is still shared as long as a widget uses it.
+
+        :param max_memory: Memory budget in bytes.
+        """
+        self._max_memory = max_memory
+        self._memory = 0
+        self._surfaces = OrderedDict()
+        self._shared = WeakValueDictionary()
+        self._format = _display_format()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return f'ImageCache(images={len(self)}, memory={self._memory}, hits={self.hits}, misses={self.misses})'
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def __contains__(self, key: Hashable):
+        return key in self._surfaces or key in self._shared
+
+    @staticmethod
+    def key(path: str, size: Optional[Tuple[int, int]] = None, convert: Optional[str] = None):
+        """
+        Get the cache key of an image.
+
+        :param path: Image path.
+        :param size: Scaled size.
+        :param convert: Convert mode.
+        :return: The key.
+        """
+        return os.path.abspath(path), tuple(size) if size else None, convert
+
+    @property
+    def memory(self):
+        """
+        Memory used by the cached surfaces in bytes.
+        """
+        return self._memory
+
+    @property
+    def max_memory(self):
+        return self._max_memory
+
+    @max_memory.setter
+    def max_memory(self, set_max_memory: int):
+        self.set_max_memory(set_max_memory)
+
+    def set_max_memory(self, max_memory: int):
+        """
+        Set the memory budget of this cache.
+
+        :param max_memory: Memory budget in bytes.
+        :return: None
+        """
+        self._max_memory = max_memory
+        self._evict()
+
+    def _evict(self):
+        """
+        Drop the least recently used surfaces until the cache fits its memory budget.
+
+        The newest surface is always kept.
+
+        :return: None
+        """
+        while self._memory > self._max_memory and len(self._surfaces) > 1:
+            _, surface = self._surfaces.popitem(last=False)
+            self._memory -= _surface_memory(surface)
+
+    def _put(self, key: Hashable, surface: pygame.Surface):
+        """
+        Put a surface in this cache.
+
+        :param key: Cache key.
+        :param surface: The surface.
+        :return: None
+        """
+        self._surfaces[key] = surface
+        self._shared[key] = surface
+        self._memory += _surface_memory(surface)
+        self._evict()
+
+    def load(self, path: str, size: Optional[Tuple[int, int]] = None, convert_alpha: bool = False):
+        """
+        Load an image, or get it from this cache.
+
+        :param path: Image path.
+        :param size: If this parameter is set, the size of the picture is scaled.
+        :param convert_alpha: Convert to RGBA even if the image has no per-pixel alpha.
+        :return: The shared surface.
+        """
+        if _display_format() != self._format:
+            self.reconvert()
+        key = self.key(path, size, 'alpha' if convert_alpha else 'auto')
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        surface = self._shared.get(key)
+        if surface is not None:   # Dropped, but still used by a widget
+            self.hits += 1
+            self._put(key, surface)
+            return surface
+
+        self.misses += 1
+        surface = pygame.image.load(path)
+        if size:
+            surface = pygame.transform.scale(surface, size)
+        surface = _convert(surface, convert_alpha)
+        self._put(key, surface)
+        return surface
+
+    def reconvert(self):
+        """
+        Convert the cached surfaces to the current display pixel format.
+
+        It is called when the display mode changes.
+        Widgets keep the surfaces they already use.
+
+        :return: None
+        """
+        self._format = _display_format()
+        self._shared.clear()
+        for key, surface in self._surfaces.items():
+            converted = _convert(surface, key[2] == 'alpha')
+            self._memory += _surface_memory(converted) - _surface_memory(surface)
+            self._surfaces[key] = converted
+            self._shared[key] = converted
+        self._evict()
+
+    def clear(self):
+        """
+        Clear this cache and reset the counters.
+
+        :return: None
+        """
+        self._surfaces.clear()
+        self._shared.clear()
+        self._memory = 0
+        self.hits = self.misses = 0
+
+
+class RotationCache(object):
+    def __init__(self, step: float = 1):
+        """
+        Easy Player rotation cache.
+
+        Angles are quantized to multiples of step degrees,
+        and every image is rotated once per quantized angle.
+        The rotations of an image are shared by all widgets using it and freed with the image.
+
+        :param step: Quantization step in degrees.
+        """
+        self._step = step
+        self._rotations = WeakKeyDictionary()
+
+    def __str__(self):
+        return f'RotationCache(step={self._step}, images={len(self._rotations)})'
+
+    @property
+    def step(self):
+        return self._step
+
+    @step.setter
+    def step(self, set_step: float):
+        self.set_step(set_step)
+
+    def set_step(self, step: float):
+        """
+        Set the quantization step and clear this cache.
+
+        :param step: Quantization step in degrees.
+        :return: None
+        """
+        self._step = step
+        self.clear()
+
+    def _index(self, angle: float):
+        """
+        Quantize an angle.
+
+        :param angle: Angle in degrees.
+        :return: Index of the quantized angle.
+        """
+        return round(angle / self._step) % round(360 / self._step)
+
+    def rotate(self, surface: pygame.Surface, angle: float):
+        """
+        Get an image rotated counterclockwise.
+
+        Always rotate the original image, so that the interpolation losses are not compounded.
+
+        :param surface: The original image.
+        :param angle: Angle in degrees.
+        :return: The rotated image.
+        """
+        index = self._index(angle)
+        if index == 0:
+            return surface
+        rotations = self._rotations.get(surface)
+        if rotations is None:
+            rotations = self._rotations[surface] = {}
+        rotated = rotations.get(index)
+        if rotated is None:
+            rotated = rotations[index] = pygame.transform.rotate(surface, index * self._step)
+        return rotated
+
+    def prebuild(self, surface: pygame.Surface):
+        """
+        Rotate an image to every quantized angle in advance.
+
+        :param surface: The original image.
+        :return: None
+        """
+        for index in range(1, round(360 / self._step)):
+            self.rotate(surface, index * self._step)
+
+    def clear(self):
+        """
+        Clear this cache.
+
+        :return: None
+        """
+        self._rotations.clear()
+
+
+class MaskCache(object):
+    def __init__(self):
+        """
+        Easy Player collision mask cache.
+
+        A mask is computed once per image and freed with the image.
+        Rotated images are different images, so each rotation angle gets its own mask.
+        """
+        self._masks = WeakKeyDictionary()
+
+    def __str__(self):
+        return f'MaskCache(images={len(self._masks)})'
+
+    def get(self, surface: pygame.Surface):
+        """
+        Get the collision mask of an image.
+
+        :param surface: The image.
+        :return: The mask.
+        """
+        mask = self._masks.get(surface)
+        if mask is None:
+            mask = self._masks[surface] = pygame.mask.from_surface(surface)
+        return mask
+
+    def clear(self):
+        """
+        Clear this cache.
+
+        :return: None
+        """
+        self._masks.clear()
+
+
+image_cache = ImageCache()  # Shared by all widgets
+rotation_cache = RotationCache()
+mask_cache = MaskCache()
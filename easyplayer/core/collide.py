@@ -0,0 +1,91 @@
+"""
+Easy Player collision detection tools.
+
+Support three modes:
+rect: Rectangle collision, fast but imprecise.
+circle: Circle collision, the circle is inscribed in the rect unless the object has a radius attribute.
+mask: Pixel-perfect collision, tested only when the rects collide.
+"""
+
+from typing import Any, Callable
+
+from easyplayer.core.cache import mask_cache
+from easyplayer.exceptions import EasyPlayerCollideError
+
+__all__ = ['collide_rect', 'collide_circle', 'collide_mask', 'get_collide', 'collide_modes']
+
+
+def collide_rect(a: Any, b: Any):
+    """
+    Determine whether the rects of two objects collide.
+
+    :param a: An object with rect attribute.
+    :param b: Other object with rect attribute.
+    :return: Whether they collide.
+    """
+    return a.rect.colliderect(b.rect)
+
+
+def _radius(obj: Any):
+    """
+    Get the collision radius of an object.
+
+    :param obj: An object with rect attribute.
+    :return: The radius attribute, or the radius of the circle inscribed in the rect.
+    """
+    radius = getattr(obj, 'radius', None)
+    if radius is None:
+        return min(obj.rect.width, obj.rect.height) / 2
+    return radius
+
+
+def collide_circle(a: Any, b: Any):
+    """
+    Determine whether the circles of two objects collide.
+
+    :param a: An object with rect attribute.
+    :param b: Other object with rect attribute.
+    :return: Whether they collide.
+    """
+    ax, ay = a.rect.center
+    bx, by = b.rect.center
+    distance = _radius(a) + _radius(b)
+    return (ax - bx) ** 2 + (ay - by) ** 2 <= distance * distance
+
+
+def collide_mask(a: Any, b: Any):
+    """
+    Determine whether the visible pixels of two objects collide.
+
+    Masks come from easyplayer.core.cache.mask_cache, and are tested only when the rects collide.
+
+    :param a: An object with rect and image attributes.
+    :param b: Other object with rect and image attributes.
+    :return: Whether they collide.
+    """
+    ra, rb = a.rect, b.rect
+    if not ra.colliderect(rb):
+        return False
+    mask_a, mask_b = mask_cache.get(a.image), mask_cache.get(b.image)
+    return mask_a.overlap(mask_b, (rb.x - ra.x, rb.y - ra.y)) is not None
+
+
+collide_modes = {
+    'rect': collide_rect,
+    'circle': collide_circle,
+    'mask': collide_mask,
+}
+
+
+def get_collide(mode: str = 'rect') -> Callable[[Any, Any], bool]:
+    """
+    Get the collision function of a mode.
+
+    :param mode: 'rect', 'circle' or 'mask'.
+    :raise: EasyPlayerCollideError
+    :return: The collision function.
+    """
+    try:
+        return collide_modes[mode]
+    except KeyError:
+        raise EasyPlayerCollideError(f'unknown collide mode: {mode}') from None
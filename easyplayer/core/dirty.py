@@ -0,0 +1,74 @@
+"""
+Easy Player dirty rectangle tools.
+
+Used by the dirty rectangle render mode of the window.
+"""
+
+from typing import Any, Iterable, List, Optional
+
+import pygame
+
+__all__ = ['DirtyTracker', 'merge_rects']
+
+
+def merge_rects(rects: Iterable[pygame.Rect]):
+    """
+    Merge overlapping rects into their union, so that no area is redrawn twice.
+
+    Rects that do not overlap are kept apart, empty rects are dropped.
+
+    :param rects: The rects.
+    :return: A list of rects that do not overlap.
+    """
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        if not (rect.width and rect.height):
+            continue
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:   # The union may reach more rects
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyTracker(object):
+    def __init__(self):
+        """
+        Remember the rect and state a widget was drawn with,
+        and report the rects that changed since then.
+        """
+        self.rect: Optional[pygame.Rect] = None
+        self._state = None
+
+    def __str__(self):
+        return f'DirtyTracker(rect={self.rect})'
+
+    def update(self, rect: pygame.Rect, *state: Any):
+        """
+        Compare the widget with the last drawn one.
+
+        Surfaces in the state are compared by identity,
+        so drawing on the same image in place is not noticed.
+
+        :param rect: Current rect of the widget.
+        :param state: Anything else that changes the look of the widget.
+        :return: A list of rects to redraw, empty when nothing changed.
+        """
+        if self.rect is not None and rect == self.rect and state == self._state:
+            return []
+        rect = pygame.Rect(rect)
+        rects = [rect] if self.rect is None else [self.rect, rect]
+        self.rect, self._state = rect, state
+        return rects
+
+    def forget(self):
+        """
+        Forget the last drawn rect, for example when the widget is removed.
+
+        :return: A list of the rects it uncovered.
+        """
+        rects: List[pygame.Rect] = [] if self.rect is None else [self.rect]
+        self.rect, self._state = None, None
+        return rects
@@ -37,10 +37,37 @@ class Event(object):
         if event is None:
             event = _EmptyEvent()
         self._event = event
+        self._stopped = False
         
     def __getitem__(self, item):
         return getattr(self._event, item)
     
+    def bind(self, event: EventType):
+        """
+        Parse another pygame event with this object, so that no object is created per event.
+        
+        :param event: Pygame event.
+        :return: None
+        """
+        self._event = event
+        self._stopped = False
+        
+    def stop_propagation(self):
+        """
+        Do not call the remaining handlers of this event.
+        
+        :return: None
+        """
+        self._stopped = True
+        
+    def stopped(self):
+        """
+        Check whether stop_propagation was called for this event.
+        
+        :return: Whether the event is stopped.
+        """
+        return self._stopped
+    
     @property
     def mouse_down(self):
         """
@@ -86,6 +113,19 @@ class Event(object):
         """
         return self._event.type == MOUSEMOTION
     
+    @property
+    def mouse_pos(self):
+        """
+        Virtual attribute, which is none when the event is not a mouse event.
+        When a mouse event is triggered, the mouse position of the event is returned,
+        which is the recorded one when events are replayed.
+
+        :return: The mouse position.
+        """
+        if self.mouse_down or self.mouse_up or self.mouse_moving:
+            return self._event.pos
+        return None
+    
     @property
     def press_left_button(self):
         """
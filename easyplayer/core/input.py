@@ -0,0 +1,215 @@
+"""
+Easy Player input state tools.
+
+The state of the keyboard and the mouse is read once per frame,
+so that game logic asks whether a key is held instead of looking for it in every event.
+
+Such as:
+
+>>> import easyplayer as ep
+>>> window = ep.Window()
+>>> window.input.bind('jump', 'space', 'w', 'mouse_left')
+>>> @window.when_draw
+>>> def draw():
+>>>     if window.input.just_pressed('jump'):
+>>>         player.jump()
+>>>     if window.input.is_held('left'):
+>>>         player.x -= 5
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import pygame
+
+from easyplayer.core.event import keys
+from easyplayer.exceptions import EasyPlayerInputError
+
+__all__ = ['Input', 'mouse_buttons']
+
+KeyType = Union[int, str]
+
+mouse_buttons = {
+    'mouse_left': 1,
+    'mouse_middle': 2,
+    'mouse_right': 3,
+    'mouse_x1': 4,
+    'mouse_x2': 5,
+}
+
+
+class _NoKeys(object):
+    """
+    Key state with no key held.
+    """
+    def __getitem__(self, item):
+        return False
+
+
+class Input(object):
+    def __init__(self):
+        """
+        Easy Player input state.
+
+        A snapshot of the keyboard and mouse, taken by the window once per frame,
+        or once per update in Window.show_fixed, so that just_pressed holds for a single update.
+
+        Keys are given as key codes (ep.keys['a'], pygame.K_a) or key names ('a', 'space', 'left').
+        Bound action names can be used everywhere a key is, and shadow key names.
+        """
+        self._keys_now = self._keys_before = _NoKeys()
+        self._mouse_now = self._mouse_before = (False,) * 5
+        self._pos = self._last_pos = (0, 0)
+        self._actions: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        self._names: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+
+    def __str__(self):
+        return f'Input(actions={list(self._actions)})'
+
+    def update(self, key_state: Optional[Sequence[bool]] = None,
+               mouse_state: Optional[Sequence[bool]] = None,
+               mouse_pos: Optional[Tuple[int, int]] = None):
+        """
+        Take a new snapshot, the current one becomes the previous one.
+
+        The state is read from pygame unless given.
+
+        :param key_state: Indexed by key code, like pygame.key.get_pressed().
+        :param mouse_state: Whether mouse buttons 1 to 5 are held.
+        :param mouse_pos: Mouse position.
+        :return: None
+        """
+        self._keys_before = self._keys_now
+        self._mouse_before = self._mouse_now
+        self._last_pos = self._pos
+        self._keys_now = pygame.key.get_pressed() if key_state is None else key_state
+        self._mouse_now = tuple(pygame.mouse.get_pressed(5) if mouse_state is None else mouse_state)
+        self._pos = pygame.mouse.get_pos() if mouse_pos is None else tuple(mouse_pos)
+
+    @staticmethod
+    def _compile(names: Iterable[KeyType]):
+        """
+        Resolve key names and mouse button names to codes.
+
+        :param names: Key codes, key names or mouse button names.
+        :return: Key codes and mouse buttons.
+        """
+        key_codes = []
+        buttons = []
+        for name in names:
+            if isinstance(name, int):
+                key_codes.append(name)
+            elif name in mouse_buttons:
+                buttons.append(mouse_buttons[name])
+            elif name in keys:
+                key_codes.append(keys[name])
+            else:
+                raise EasyPlayerInputError(f'Unknown key name: {name!r}')
+        return tuple(key_codes), tuple(buttons)
+
+    def bind(self, action: str, *names: KeyType):
+        """
+        Bind an action to keys and mouse buttons, names are resolved once here.
+
+        :param action: Action name.
+        :param names: Key codes, key names or mouse button names ('mouse_left', 'mouse_middle', 'mouse_right').
+        :return: None
+        """
+        self._actions[action] = self._compile(names)
+
+    def unbind(self, action: str):
+        """
+        Remove an action if it is bound.
+
+        :param action: Action name.
+        :return: None
+        """
+        self._actions.pop(action, None)
+
+    @property
+    def actions(self):
+        """
+        Bound action names.
+
+        :return: A list of action names.
+        """
+        return list(self._actions)
+
+    def _lookup(self, key: KeyType):
+        """
+        Get the key codes and mouse buttons of a key or an action.
+
+        :param key: Key code, key name, mouse button name or action name.
+        :return: Key codes and mouse buttons.
+        """
+        if isinstance(key, int):
+            return (key,), ()
+        action = self._actions.get(key)
+        if action is None:
+            action = self._names.get(key)
+            if action is None:
+                action = self._names[key] = self._compile((key,))   # Resolved once per name
+        return action
+
+    def _state(self, key: KeyType, now: bool):
+        """
+        Check whether a key or an action is held in the current or the previous snapshot.
+
+        :param key: Key code, key name, mouse button name or action name.
+        :param now: Current snapshot if true, the previous one otherwise.
+        :return: Whether it is held.
+        """
+        key_codes, buttons = self._lookup(key)
+        key_state = self._keys_now if now else self._keys_before
+        mouse_state = self._mouse_now if now else self._mouse_before
+        for code in key_codes:
+            if key_state[code]:
+                return True
+        for button in buttons:
+            if mouse_state[button - 1]:
+                return True
+        return False
+
+    def is_held(self, key: KeyType):
+        """
+        Check whether a key, or any key of an action, is held.
+
+        :param key: Key code, key name, mouse button name or action name.
+        :return: Whether it is held.
+        """
+        return self._state(key, True)
+
+    def just_pressed(self, key: KeyType):
+        """
+        Check whether a key or an action was pressed since the previous snapshot.
+
+        :param key: Key code, key name, mouse button name or action name.
+        :return: Whether it was pressed.
+        """
+        return self._state(key, True) and not self._state(key, False)
+
+    def just_released(self, key: KeyType):
+        """
+        Check whether a key or an action was released since the previous snapshot.
+
+        :param key: Key code, key name, mouse button name or action name.
+        :return: Whether it was released.
+        """
+        return self._state(key, False) and not self._state(key, True)
+
+    @property
+    def mouse_pos(self):
+        """
+        Mouse position.
+
+        :return: Position.
+        """
+        return self._pos
+
+    @property
+    def mouse_rel(self):
+        """
+        Mouse movement since the previous snapshot.
+
+        :return: Movement.
+        """
+        return self._pos[0] - self._last_pos[0], self._pos[1] - self._last_pos[1]
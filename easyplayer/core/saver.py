@@ -3,49 +3,135 @@ Easy Player saver
 """
 
 from random import choice
+from typing import Any, Callable, Iterable, List, Optional
 
 __all__ = ['queue', 'SpriteQueue']
 
 queue = []  # 窗口队列，用于存档
 
 class SpriteQueue(object):
-    def __init__(self):
+    def __init__(self, on_add: Optional[Callable[[Any], Any]] = None,
+                 on_remove: Optional[Callable[[Any], Any]] = None):
         """
         Easy Player sprite layer displays the queue.
         
         Note: the element at the end of the queue is placed at the top level (opposite to the layer order).
+        
+        Every sprite has a numeric z-layer, higher layers are drawn above lower layers,
+        and sprites in the same layer keep the order they were added in.
+        Adding, removing, looking up and re-layering a sprite cost O(1),
+        the ordered queue is rebuilt at most once between changes and iterations.
+        
+        :param on_add: Called with a sprite when it is put in the queue (not when it is moved).
+        :param on_remove: Called with a sprite when it is taken out of the queue.
         """
-        self.queue = []
+        self._on_add = on_add
+        self._on_remove = on_remove
+        self._keys = {}   # Sprite -> (layer, order)
+        self._items: List[Any] = []
+        self._stale = False
+        self._top = 0
+        self._bottom = 0
         
     def __str__(self):
         return f'SpriteQueue()'
     
+    def __len__(self):
+        return len(self._keys)
+    
+    def __contains__(self, item):
+        return item in self._keys
+    
+    def __iter__(self):
+        return iter(self.queue)
+    
     def __getitem__(self, item):
         return self.queue[item]
     
     def __setitem__(self, key, value):
-        self.queue[key] = value
+        old = self.queue[key]
+        if old is value:
+            return
+        self.remove(value)
+        self._keys[value] = self._keys.pop(old)
+        self._stale = True
+        if self._on_remove is not None:
+            self._on_remove(old)
+        if self._on_add is not None:
+            self._on_add(value)
+    
+    @property
+    def queue(self):
+        """
+        The ordered queue, from the bottom level to the top level.
+        
+        Do not modify it, use the methods of the sprite queue.
+        
+        :return: A list of sprites.
+        """
+        if self._stale:
+            keys = self._keys
+            self._items = sorted(keys, key=keys.__getitem__)  # Nearly sorted, so it is fast
+            self._stale = False
+        return self._items
         
-    def append(self, item):
+    def append(self, item, layer: int = 0):
         """
-        Put a sprite at the end of the queue (at the top)
+        Put a sprite at the end of the queue (at the top of its layer).
+        
+        If the sprite is in the queue, it is moved.
         
         :param item: A sprite.
+        :param layer: Z-layer.
         :return: None
         """
-        self.queue.append(item)
+        self._top += 1
+        key = (layer, self._top)
+        new = item not in self._keys
+        if not new:
+            self._stale = True
+        elif not self._stale and (not self._items or key > self._keys[self._items[-1]]):
+            self._items.append(item)   # Still in order
+        else:
+            self._stale = True
+        self._keys[item] = key
+        if new and self._on_add is not None:
+            self._on_add(item)
         
-    def remove(self, item):
+    add = append
+    
+    def extend(self, items: Iterable[Any], layer: int = 0):
+        """
+        Put sprites at the end of the queue (at the top of their layer).
+        
+        :param items: Sprites.
+        :param layer: Z-layer.
+        :return: None
         """
-        If the sprite is in the game queue, delete the sprite (only once).
+        for item in items:
+            self.append(item, layer)
         
-        Note: this function first deletes the sprite at the bottom of the layer.
+    def remove(self, item):
+        """
+        If the sprite is in the game queue, delete the sprite.
         
         :param item: A sprite.
         :return: None
         """
-        if item in self.queue:
-            self.queue.remove(item)
+        if self._keys.pop(item, None) is not None:
+            self._stale = True
+            if self._on_remove is not None:
+                self._on_remove(item)
+            
+    def remove_all(self, items: Iterable[Any]):
+        """
+        Delete sprites that are in the game queue.
+        
+        :param items: Sprites.
+        :return: None
+        """
+        for item in items:
+            self.remove(item)
             
     def clear(self):
         """
@@ -53,7 +139,13 @@ class SpriteQueue(object):
         
         :return: None
         """
-        self.queue.clear()
+        items = list(self._keys)
+        self._keys.clear()
+        self._items = []
+        self._stale = False
+        if self._on_remove is not None:
+            for item in items:
+                self._on_remove(item)
         
     def random(self):
         """
@@ -63,53 +155,109 @@ class SpriteQueue(object):
         """
         return choice(self.queue)
     
-    def swap(self, sprite1, sprite2):
+    def top(self, items: Iterable[Any]):
+        """
+        Get the sprite at the highest level among some sprites.
+        
+        Sprites that are not in the queue are ignored.
+        
+        :param items: Sprites.
+        :return: The sprite at the highest level, None if no sprite is in the queue.
+        """
+        keys = self._keys
+        items = [item for item in items if item in keys]
+        if not items:
+            return None
+        return max(items, key=keys.__getitem__)
+    
+    def get_layer(self, item):
+        """
+        Get the z-layer of a sprite.
+        
+        :param item: A sprite in the queue.
+        :raise: KeyError
+        :return: Z-layer.
+        """
+        return self._keys[item][0]
+    
+    def set_layer(self, item, layer: int):
+        """
+        If the sprite is in the queue, move it to the top of another z-layer.
+        
+        :param item: A sprite.
+        :param layer: Z-layer.
+        :return: None
         """
-        If both sprite 1 and sprite 2 exist in the queue, the positions of the two sprites are exchanged.
+        if item in self._keys:
+            self.append(item, layer)
+            
+    @property
+    def layers(self):
+        """
+        The z-layers in use, from the bottom to the top.
         
-        Note: This function gives priority to moving the role at the bottom of the layer.
+        :return: A sorted list of z-layers.
+        """
+        return sorted({layer for layer, _ in self._keys.values()})
+    
+    def swap(self, sprite1, sprite2):
+        """
+        If both sprite 1 and sprite 2 exist in the queue, the positions (and layers) of the two sprites are exchanged.
         
         :param sprite1: Sprite 1.
         :param sprite2: Sprite 2.
         :return: None
         """
-        if (sprite1 in self.queue) and (sprite2 in self.queue):
-            a, b = self.queue.index(sprite1), self.queue.index(sprite2)
-            if a != b:
-                self.queue[a], self.queue[b] = self.queue[b], self.queue[a]
+        keys = self._keys
+        if sprite1 is not sprite2 and sprite1 in keys and sprite2 in keys:
+            keys[sprite1], keys[sprite2] = keys[sprite2], keys[sprite1]
+            self._stale = True
                 
     def move(self, sprite, index: int):
         """
         If the sprite is in the queue, move the sprite to the specified location.
         
-        Note: This function gives priority to moving the role at the bottom of the layer.
+        Negative indexes count from the top, -1 is the top level.
+        The sprite takes the z-layer of the sprite below it.
         
         :param sprite: The sprite.
         :param index: Sprite index.
         :return: None
         """
-        if sprite in self.queue:
-            self.queue.insert(index, sprite)
-            self.remove(sprite)
+        if sprite not in self._keys:
+            return
+        items = [item for item in self.queue if item != sprite]
+        if index < 0:
+            index += len(items) + 1
+        index = min(max(index, 0), len(items))
+        keys = self._keys
+        neighbour = items[index - 1] if index > 0 else (items[0] if items else sprite)
+        items.insert(index, sprite)
+        keys[sprite] = keys[neighbour]
+        for order, item in enumerate(items):   # Renumber, layers stay sorted
+            keys[item] = (keys[item][0], order)
+        self._top, self._bottom = len(items), 0
+        self._items = items
+        self._stale = False
             
     def move_first(self, sprite):
         """
-        If the sprite is in the queue, move the sprite to the top level.
+        If the sprite is in the queue, move the sprite to the top of its layer.
         
-        Note: This function gives priority to moving the role at the bottom of the layer.
-
         :param sprite: A sprite.
         :return: None
         """
-        self.move(sprite, -1)
+        if sprite in self._keys:
+            self.append(sprite, self._keys[sprite][0])
         
     def move_last(self, sprite):
         """
-        If the sprite is in the queue, move the sprite to the bottom level.
+        If the sprite is in the queue, move the sprite to the bottom of its layer.
         
-        Note: This function gives priority to moving the role at the bottom of the layer.
-
         :param sprite: A sprite.
         :return: None
         """
-        self.move(sprite, 0)
+        if sprite in self._keys:
+            self._bottom -= 1
+            self._keys[sprite] = (self._keys[sprite][0], self._bottom)
+            self._stale = True
@@ -0,0 +1,287 @@
+"""
+Easy Player font registry and text render cache.
+
+Fonts are loaded once per (file or system name, size, bold, italic) and shared.
+
+Rendered texts are cached by (font, text, antialias, color), so that labels showing
+the same text do not render it again.
+Texts that change every frame, such as scores and timers, are drawn from a glyph atlas instead,
+every character is rendered once and the text is put together from them.
+
+Such as:
+
+>>> import easyplayer as ep
+>>> score = ep.Label('0', numeric=True)
+>>> score.set_text(1024)
+>>> print(ep.text_cache.hits, ep.text_cache.misses)
+"""
+
+import os
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+import pygame
+
+__all__ = ['FontRegistry', 'GlyphAtlas', 'TextCache', 'font_registry', 'text_cache', 'NUMERIC']
+
+ColorType = Union[Tuple[int, int, int], Tuple[int, int, int, int], pygame.color.Color, str]
+
+NUMERIC = '0123456789+-.,:/% '
+
+
+def _color_key(color: ColorType):
+    """
+    Get a hashable form of a color.
+
+    :param color: The color.
+    :return: RGBA tuple.
+    """
+    return tuple(pygame.Color(color))
+
+
+class FontRegistry(object):
+    def __init__(self):
+        """
+        Easy Player font registry.
+
+        Pygame fonts are loaded once per (file or system name, size, bold, italic) and shared,
+        so do not change their style, get another font instead.
+        The font module is initialized on the first load, not on import.
+        """
+        self._fonts: Dict[Hashable, pygame.font.Font] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return f'FontRegistry(fonts={len(self)}, hits={self.hits}, misses={self.misses})'
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def _get(self, key: Hashable):
+        """
+        Get a font from this registry, or load it.
+
+        :param key: (kind, file or system name, size, bold, italic).
+        :return: The shared pygame font.
+        """
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+        self.misses += 1
+        if not pygame.font.get_init():
+            pygame.font.init()
+        kind, name, size, bold, italic = key
+        if kind == 'system':
+            font = pygame.font.SysFont(name, size, bold, italic)
+        else:
+            font = pygame.font.Font(name, size)
+            font.set_bold(bold)
+            font.set_italic(italic)
+        self._fonts[key] = font
+        return font
+
+    def get(self, font_path: Optional[str] = None, size: int = 25, bold: bool = False, italic: bool = False):
+        """
+        Get a font loaded from a file.
+
+        :param font_path: Font file path, None for the pygame default font.
+        :param size: Font size.
+        :param bold: Bold.
+        :param italic: Italic.
+        :return: The shared pygame font.
+        """
+        if font_path is not None:
+            font_path = os.path.abspath(font_path)
+        return self._get(('file', font_path, size, bool(bold), bool(italic)))
+
+    def get_system(self, name: str, size: int = 25, bold: bool = False, italic: bool = False):
+        """
+        Get a system font.
+
+        :param name: The name of this system font, such as "Times" or "simsun".
+        :param size: Font size.
+        :param bold: Bold.
+        :param italic: Italic.
+        :return: The shared pygame font.
+        """
+        return self._get(('system', name, size, bool(bold), bool(italic)))
+
+    def clear(self):
+        """
+        Forget all fonts and reset the counters. Widgets keep the fonts they already use.
+
+        :return: None
+        """
+        self._fonts.clear()
+        self.hits = self.misses = 0
+
+
+class GlyphAtlas(object):
+    def __init__(self, font: pygame.font.Font, antialias: bool = True,
+                 color: ColorType = (0, 0, 0), chars: str = NUMERIC):
+        """
+        Easy Player glyph atlas.
+
+        Renders every character of chars once, and puts texts together from the glyphs.
+        Kerning is not applied, which is fine for digits, as most fonts give them the same width.
+
+        :param font: Pygame font.
+        :param antialias: Whether antialias.
+        :param color: The color of the text.
+        :param chars: Characters in the atlas.
+        """
+        self._font = font
+        self._height = font.get_height()
+        self._glyphs: Dict[str, Tuple[pygame.Surface, int]] = {}
+        for char in chars:
+            rendered = font.render(char, antialias, color)
+            glyph = pygame.Surface(rendered.get_size(), pygame.SRCALPHA)
+            glyph.blit(rendered, (0, 0))   # Same pixel format for all glyphs, colorkey becomes alpha
+            self._glyphs[char] = glyph, glyph.get_width()
+        self._chars = frozenset(self._glyphs)
+
+    def __str__(self):
+        return f'GlyphAtlas(chars={"".join(self._glyphs)!r})'
+
+    def __contains__(self, text: str):
+        return self._chars.issuperset(text)
+
+    def render(self, text: str):
+        """
+        Put a text together from the glyphs.
+
+        :param text: Text made of characters in this atlas.
+        :raise: KeyError
+        :return: A new surface.
+        """
+        glyphs = self._glyphs
+        flags = pygame.BLEND_RGBA_MAX   # Glyphs do not overlap, so this copies their pixels
+        x = 0
+        blits = []
+        for char in text:
+            glyph, width = glyphs[char]
+            blits.append((glyph, (x, 0), None, flags))
+            x += width
+        surface = pygame.Surface((x, self._height), pygame.SRCALPHA)
+        surface.blits(blits, False)
+        return surface
+
+
+class TextCache(object):
+    def __init__(self, max_items: int = 512):
+        """
+        Easy Player text render cache.
+
+        Rendered surfaces are keyed by (font, text, antialias, color) and shared,
+        so do not draw on them, copy them first.
+        The least recently used surfaces are dropped when there are more than max_items.
+
+        :param max_items: Number of rendered texts kept.
+        """
+        self._max_items = max_items
+        self._surfaces = OrderedDict()
+        self._atlases: Dict[Hashable, GlyphAtlas] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return f'TextCache(texts={len(self)}, hits={self.hits}, misses={self.misses})'
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    @property
+    def max_items(self):
+        return self._max_items
+
+    @max_items.setter
+    def max_items(self, set_max_items: int):
+        self.set_max_items(set_max_items)
+
+    def set_max_items(self, max_items: int):
+        """
+        Set the number of rendered texts kept.
+
+        :param max_items: Number of rendered texts.
+        :return: None
+        """
+        self._max_items = max_items
+        while len(self._surfaces) > max(max_items, 0):
+            self._surfaces.popitem(last=False)
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool = True, color: ColorType = (0, 0, 0)):
+        """
+        Render a text, or get it from this cache.
+
+        :param font: Pygame font.
+        :param text: Text content.
+        :param antialias: Whether antialias.
+        :param color: The color of the text.
+        :return: The shared surface.
+        """
+        key = font, text, bool(antialias), _color_key(color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self._surfaces[key] = font.render(text, antialias, color)
+        if len(self._surfaces) > self._max_items:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def atlas(self, font: pygame.font.Font, antialias: bool = True, color: ColorType = (0, 0, 0)):
+        """
+        Get the numeric glyph atlas of a font style.
+
+        :param font: Pygame font.
+        :param antialias: Whether antialias.
+        :param color: The color of the text.
+        :return: The atlas.
+        """
+        key = font, bool(antialias), _color_key(color)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = GlyphAtlas(font, antialias, color)
+        return atlas
+
+    def render_numeric(self, font: pygame.font.Font, text: str, antialias: bool = True,
+                       color: ColorType = (0, 0, 0), atlas: Optional[GlyphAtlas] = None):
+        """
+        Render a fast-changing text from the glyph atlas, without filling this cache.
+
+        Texts with characters outside the atlas, and empty texts, are rendered through the cache.
+        Keep the atlas from TextCache.atlas and pass it when rendering often.
+
+        :param font: Pygame font.
+        :param text: Text content.
+        :param antialias: Whether antialias.
+        :param color: The color of the text.
+        :param atlas: The atlas of this font style.
+        :return: A surface.
+        """
+        if atlas is None:
+            atlas = self.atlas(font, antialias, color)
+        if text:
+            try:
+                return atlas.render(text)
+            except KeyError:
+                pass
+        return self.render(font, text, antialias, color)
+
+    def clear(self):
+        """
+        Clear this cache and the atlases, and reset the counters.
+
+        :return: None
+        """
+        self._surfaces.clear()
+        self._atlases.clear()
+        self.hits = self.misses = 0
+
+
+font_registry = FontRegistry()  # Shared by all fonts
+text_cache = TextCache()  # Shared by all labels
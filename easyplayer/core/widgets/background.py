@@ -4,8 +4,7 @@ Easy Player background widget.
 Provide simple background functions.
 """
 
-import pygame
-
+from easyplayer.core.saver import queue
 from easyplayer.core.widgets.sprite import Sprite
 
 __all__ = ['Background']
@@ -21,14 +20,10 @@ class Background(Sprite):
         :param image: Background image path.
         :param fullscreen: Adaptive screen size.
         """
-        super().__init__(image)
+        size = queue[-1].screen.get_size() if fullscreen and queue else None
+        super().__init__(image, size)  # Scaled once and shared through the image cache
         self._screen_rect = self._screen.get_rect()
         self._fullscreen = fullscreen
-        if fullscreen:
-            self.image = pygame.transform.scale(self.image,
-                                                (self._screen_rect.width,
-                                                 self._screen_rect.height))
-            self.rect = self.image.get_rect()
             
     def __copy__(self):
         """
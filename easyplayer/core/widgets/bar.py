@@ -7,6 +7,7 @@ from typing import Tuple
 import pygame
 
 from easyplayer.core.saver import queue
+from easyplayer.core.dirty import DirtyTracker
 from easyplayer.exceptions import EasyPlayerSaverError
 from easyplayer.utils.color import ColorType
 
@@ -40,6 +41,8 @@ class Bar(object):
         
         self.border_color = border_color
         self.bar_color = bar_color
+        self.dirty_tracker = DirtyTracker()
+        self.always_show = False  # Show even when outside the screen
         
     @property
     def pos(self):
@@ -58,14 +61,27 @@ class Bar(object):
         """
         self.rect_border = pygame.rect.Rect(self.x, self.y, self.width, self.height)
         self.rect_bar = pygame.rect.Rect(self.x, self.y, self.width * self.proportion, self.height)
+        self.rect = self.rect_border
         
-    def pack(self):
+    def dirty_rects(self):
+        """
+        Get the rects this bar touched or uncovered since it was last drawn.
+        
+        Used by the dirty rectangle render mode of the window.
+        
+        :return: A list of rects.
+        """
+        return self.dirty_tracker.update(self.rect_border, tuple(self.rect_bar), self.border_width,
+                                         tuple(self.border_color), tuple(self.bar_color))
+        
+    def pack(self, layer: int = 0):
         """
         Pack this bar object.
         
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._game.add_sprite(self)
+        self._game.add_sprite(self, layer)
         
     def show(self):
         """
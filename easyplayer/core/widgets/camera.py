@@ -173,10 +173,11 @@ class Camera(object):
         if image is not None:
             self._screen.blit(image, (self.x, self.y))
         
-    def pack(self):
+    def pack(self, layer: int = 0):
         """
         Pack this camera object.
         
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._game.add_sprite(self)
+        self._game.add_sprite(self, layer)
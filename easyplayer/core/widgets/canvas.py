@@ -1,29 +1,426 @@
 """
 Easy Player graphic tools.
+
+A canvas keeps what its pens drew as a display list, and draws it on its own surface
+only when the list changes, so a static chart costs one blit per frame.
+
+Such as:
+
+>>> import easyplayer as ep
+>>> window = ep.Window()
+>>> canvas = ep.Canvas((200, 100), bgcolor=(255, 255, 255), retained=True)
+>>> pen = canvas.init_pen()
+>>> pen.line((0, 50), (200, 50))
+>>> canvas.pack()
+>>> window.show()
 """
 
-from typing import Tuple, Union, List, Sequence
+from typing import Tuple, Union, List, Sequence, Optional, Any, Callable, Dict
 
+import numpy as np
 import pygame
 from pygame import draw
 from pygame import gfxdraw
+from pygame import surfarray
 
 from easyplayer.core.saver import queue
+from easyplayer.core.dirty import DirtyTracker
 from easyplayer.exceptions import EasyPlayerSaverError, EasyPlayerCanvasError
 from easyplayer.utils.color import ColorType
 
 __all__ = ['Canvas', 'Pen']
 
 PointType = Union[List[int], Tuple[int, int], pygame.math.Vector2]
+ArrayType = Union[np.ndarray, Sequence[Any]]
+
+_MAX_STAMP_GROUPS = 256  # More radius and color pairs than this in a batch are drawn one by one
+_MAX_RASTER_LENGTH = 16  # Thin lines longer than this on average are drawn one by one by pygame
+
+
+def _point(point: PointType):
+    """
+    Get an immutable form of a point, so that display lists can be compared.
+    
+    :param point: The point.
+    :return: A tuple.
+    """
+    return tuple(point)
+
+
+def _color(color: ColorType):
+    """
+    Get an immutable form of a color, so that display lists can be compared.
+    
+    :param color: The color.
+    :return: RGBA tuple.
+    """
+    return tuple(pygame.Color(color))
+
+
+def _clip(surface: pygame.Surface, rect: Optional[Tuple[int, int, int, int]]):
+    """
+    Clip the following commands, see Canvas.set_clip.
+    
+    :param surface: Canvas surface.
+    :param rect: Clip rect, None for the whole surface.
+    :return: None
+    """
+    surface.set_clip(rect)
+
+
+def _circle(surface: pygame.Surface, color: ColorType, center: PointType, radius: int, width: int):
+    """
+    Draw a circle, see Pen.circle.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    draw.circle(surface, color, center, radius, width=width)
+
+
+def _rect(surface: pygame.Surface, color: ColorType, rect: Tuple[int, int, int, int], width: int):
+    """
+    Draw a rectangle, see Pen.rect.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    draw.rect(surface, color, rect, width=width)
+
+
+def _line(surface: pygame.Surface, color: ColorType, start_pos: PointType, end_pos: PointType,
+          width: int, antialias: bool):
+    """
+    Draw a line, see Pen.line.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    func = draw.aaline if antialias else draw.line
+    func(surface, color, start_pos, end_pos, width)
+
+
+def _polygon(surface: pygame.Surface, color: ColorType, points: Sequence[PointType], width: int):
+    """
+    Draw a polygon, see Pen.polygon.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    draw.polygon(surface, color, points, width=width)
+
+
+def _ellipse(surface: pygame.Surface, color: ColorType, rect: Tuple[int, int, int, int], width: int):
+    """
+    Draw an ellipse, see Pen.ellipse.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    draw.ellipse(surface, color, rect, width=width)
+
+
+def _triangle(surface: pygame.Surface, color: ColorType, point1: PointType, point2: PointType, point3: PointType,
+              fill: bool):
+    """
+    Draw a triangle, see Pen.triangle.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    x1, y1 = point1
+    x2, y2 = point2
+    x3, y3 = point3
+    func = gfxdraw.filled_trigon if fill else gfxdraw.trigon
+    func(surface, x1, y1, x2, y2, x3, y3, color)
+
+
+def _arc(surface: pygame.Surface, color: ColorType, point: PointType, radius: int, start_angel: int, stop_angel: int):
+    """
+    Draw an arc, see Pen.arc.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    x, y = point
+    gfxdraw.arc(surface, x, y, radius, start_angel, stop_angel, color)
+
+
+def _pie(surface: pygame.Surface, color: ColorType, point: PointType, radius: int, start_angel: int, stop_angel: int):
+    """
+    Draw a pie, see Pen.pie.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    x, y = point
+    gfxdraw.pie(surface, x, y, radius, start_angel, stop_angel, color)
+
+
+def _bezier(surface: pygame.Surface, color: ColorType, points: Sequence[PointType], steps: int):
+    """
+    Draw a bezier curve, see Pen.bezier.
+    
+    :param surface: Canvas surface.
+    :return: None
+    """
+    gfxdraw.bezier(surface, points, steps, color)
+
+
+class _Batch(object):
+    """
+    Read-only arrays of a batch command, compared by value, so that display lists can be compared.
+    """
+    def __init__(self, *arrays: np.ndarray):
+        self.arrays = []
+        for array in arrays:
+            array = np.array(array)
+            array.flags.writeable = False
+            self.arrays.append(array)
+    
+    def __len__(self):
+        return len(self.arrays[0])
+    
+    def __eq__(self, other):
+        if not isinstance(other, _Batch):
+            return False
+        return all(a.shape == b.shape and np.array_equal(a, b) for a, b in zip(self.arrays, other.arrays))
+    
+    __hash__ = None
+
+
+def _batch_colors(colors: Optional[ArrayType], default: ColorType, count: int):
+    """
+    Get the colors of a batch.
+    
+    :param colors: None for the default color, one color, or one color per element.
+    :param default: Pen color.
+    :param count: Number of elements.
+    :raise: EasyPlayerCanvasError
+    :return: RGB array of shape (count, 3).
+    """
+    if colors is None:
+        colors = default
+    if isinstance(colors, (str, pygame.Color)):
+        colors = pygame.Color(colors)[:3]
+    colors = np.asarray(colors)
+    if colors.ndim == 1:
+        colors = np.broadcast_to(colors[:3], (count, 3))
+    elif colors.ndim != 2 or len(colors) != count or colors.shape[1] not in (3, 4):
+        raise EasyPlayerCanvasError('Colors must be one color or one color per element')
+    return colors[:, :3].astype(np.uint8)
+
+
+def _map_colors(surface: pygame.Surface, colors: np.ndarray):
+    """
+    Map RGB colors to the pixel values of a 32-bit surface, opaque.
+    
+    :param surface: The surface.
+    :param colors: RGB array of shape (n, 3).
+    :return: Array of pixel values.
+    """
+    values = np.zeros(len(colors), np.uint32)
+    for channel, mask, shift, loss in zip(range(4), surface.get_masks(), surface.get_shifts(), surface.get_losses()):
+        if mask:
+            value = colors[:, channel].astype(np.uint32) if channel < 3 else np.uint32(255)
+            values |= (value >> loss) << shift
+    return values
+
+
+def _put_pixels(surface: pygame.Surface, x: np.ndarray, y: np.ndarray, colors: np.ndarray,
+                which: Optional[np.ndarray] = None):
+    """
+    Write pixels straight into a surface, pixels out of its clip are skipped.
+    
+    :param surface: The surface.
+    :param x: X coordinates.
+    :param y: Y coordinates.
+    :param colors: RGB array of shape (n, 3).
+    :param which: The color of every pixel, as an index in colors, None when there is one color per pixel.
+    :return: None
+    """
+    left, top, w, h = surface.get_clip()
+    inside = (x >= left) & (x < left + w) & (y >= top) & (y < top + h)
+    if surface.get_bytesize() == 4:   # One integer per pixel, much faster than three bytes
+        pixels, values = surfarray.pixels2d(surface), _map_colors(surface, colors)
+    else:
+        pixels, values = surfarray.pixels3d(surface), colors
+    try:
+        pixels[x[inside], y[inside]] = values[inside] if which is None else values[which[inside]]
+    finally:
+        del pixels   # Unlock the surface
+
+
+def _pixels_points(surface: pygame.Surface, batch: _Batch):
+    """
+    Draw a batch of points, see Pen.points.
+    
+    :param surface: Canvas surface.
+    :param batch: Coordinates and colors.
+    :return: None
+    """
+    xy, colors = batch.arrays
+    _put_pixels(surface, xy[:, 0], xy[:, 1], colors)
+
+
+_stamps: Dict[Tuple[int, int, int], pygame.Surface] = {}
+
+
+def _stamp(radius: int, width: int, rgb: int):
+    """
+    Get a circle image to blit.
+    
+    :param radius: Circle radius.
+    :param width: Border width, 0 to fill.
+    :param rgb: Color packed as 0xRRGGBB.
+    :return: The image, its colorkey is the inverse color.
+    """
+    key = radius, width, rgb
+    stamp = _stamps.get(key)
+    if stamp is None:
+        if len(_stamps) > 4096:
+            _stamps.clear()
+        color = (rgb >> 16) & 255, (rgb >> 8) & 255, rgb & 255
+        colorkey = tuple(255 - c for c in color)
+        stamp = pygame.Surface((radius * 2 + 2, radius * 2 + 2))
+        stamp.fill(colorkey)
+        stamp.set_colorkey(colorkey)
+        draw.circle(stamp, color, (radius, radius), radius, width=width)
+        stamp = _stamps[key] = stamp
+    return stamp
+
+
+def _circles(surface: pygame.Surface, batch: _Batch, width: int):
+    """
+    Draw a batch of circles, see Pen.circles.
+    
+    :param surface: Canvas surface.
+    :param batch: Centers, radii and colors.
+    :param width: Border width, 0 to fill.
+    :return: None
+    """
+    centers, radii, colors = batch.arrays
+    left, top, w, h = surface.get_clip()
+    x, y = centers[:, 0], centers[:, 1]
+    inside = (x + radii >= left) & (x - radii < left + w) & (y + radii >= top) & (y - radii < top + h)
+    centers, radii, colors = centers[inside], radii[inside], colors[inside]
+    if not len(radii):
+        return
+    rgb = (colors[:, 0].astype(np.int64) << 16) | (colors[:, 1].astype(np.int64) << 8) | colors[:, 2]
+    groups, inverse = np.unique(radii.astype(np.int64) << 24 | rgb, return_inverse=True)
+    if len(groups) > _MAX_STAMP_GROUPS:
+        circle = draw.circle
+        for center, radius, color in zip(centers.tolist(), radii.tolist(), colors.tolist()):
+            circle(surface, color, center, radius, width=width)
+        return
+    stamps = [_stamp(int(key >> 24), width, int(key & 0xFFFFFF)) for key in groups.tolist()]
+    corners = (centers - radii[:, None]).tolist()
+    surface.blits([(stamps[index], corner) for index, corner in zip(inverse.ravel().tolist(), corners)], False)
+
+
+def _raster_lines(surface: pygame.Surface, segments: np.ndarray, colors: np.ndarray):
+    """
+    Draw thin lines by writing their pixels, every pixel of all lines is computed at once.
+    
+    A line takes one pixel per step along its longer axis, at the same pixels as pygame.draw.line,
+    except near the clip border for lines crossing it, as pygame clips the line first.
+    Long lines are drawn one by one by pygame, which is faster for them, see _MAX_RASTER_LENGTH.
+    
+    :param surface: The surface.
+    :param segments: Start and end positions, an integer array of shape (n, 2, 2).
+    :param colors: RGB array of shape (n, 3).
+    :return: None
+    """
+    x0, y0 = segments[:, 0, 0].astype(np.int32), segments[:, 0, 1].astype(np.int32)
+    dx, dy = segments[:, 1, 0] - x0, segments[:, 1, 1] - y0
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    counts = steps + 1
+    total = int(counts.sum())
+    if total > _MAX_RASTER_LENGTH * len(segments):
+        line = draw.line
+        for (start_pos, end_pos), color in zip(segments.tolist(), colors.tolist()):
+            line(surface, color, start_pos, end_pos)
+        return
+    which = np.repeat(np.arange(len(segments), dtype=np.int32), counts)   # The line of every pixel
+    step = np.arange(total, dtype=np.int32) - np.repeat((np.cumsum(counts) - counts).astype(np.int32), counts)
+    major = np.maximum(steps, 1).astype(np.int64)
+    half = ((major - 1) // 2)[which]   # Rounds like the error term of pygame.draw.line
+    major, step = major[which], step.astype(np.int64)
+    x = x0[which] + (np.sign(dx)[which] * ((step * np.abs(dx)[which] + half) // major)).astype(np.int32)
+    y = y0[which] + (np.sign(dy)[which] * ((step * np.abs(dy)[which] + half) // major)).astype(np.int32)
+    _put_pixels(surface, x, y, colors, which)
+
+
+def _lines(surface: pygame.Surface, batch: _Batch, width: int, antialias: bool):
+    """
+    Draw a batch of lines, see Pen.lines.
+    
+    Short thin lines are rasterized together with numpy.
+    Other lines are drawn with one pygame.draw.lines or aalines call per run of connected lines of the same color.
+    
+    :param surface: Canvas surface.
+    :param batch: Segments and colors.
+    :param width: Line width.
+    :param antialias: Whether antialias.
+    :return: None
+    """
+    segments, colors = batch.arrays
+    left, top, w, h = surface.get_clip()
+    xs, ys = segments[:, :, 0], segments[:, :, 1]
+    inside = ((xs.max(axis=1) >= left) & (xs.min(axis=1) < left + w) &
+              (ys.max(axis=1) >= top) & (ys.min(axis=1) < top + h))
+    segments, colors = segments[inside], colors[inside]
+    if not len(segments):
+        return
+    if width == 1 and not antialias:
+        _raster_lines(surface, segments, colors)
+        return
+    joined = (segments[1:, 0] == segments[:-1, 1]).all(axis=1) & (colors[1:] == colors[:-1]).all(axis=1)
+    breaks = np.flatnonzero(~joined) + 1   # First line of every run
+    for begin, end in zip([0] + breaks.tolist(), breaks.tolist() + [len(segments)]):
+        points = [segments[begin, 0].tolist()] + segments[begin:end, 1].tolist()
+        color = colors[begin].tolist()
+        if antialias:
+            draw.aalines(surface, color, False, points)
+        else:
+            draw.lines(surface, color, False, points, width)
+
+
+# Display list command name -> draw function, called with the canvas surface and the command arguments
+primitives: Dict[str, Callable[..., Any]] = {
+    'clip': _clip,
+    'circle': _circle,
+    'rect': _rect,
+    'line': _line,
+    'polygon': _polygon,
+    'ellipse': _ellipse,
+    'triangle': _triangle,
+    'arc': _arc,
+    'pie': _pie,
+    'bezier': _bezier,
+    'points': _pixels_points,
+    'circles': _circles,
+    'lines': _lines,
+}
 
 
 class Canvas(object):
-    def __init__(self, size: PointType = (100, 100), bgcolor: ColorType = (0, 0, 0)):
+    def __init__(self, size: PointType = (100, 100), bgcolor: ColorType = (0, 0, 0), retained: bool = False):
         """
         Easy Player canvas object.
         
+        Pens draw in canvas coordinates, and what is out of the canvas is clipped.
+        
+        By default, pens draw on the screen at once, in the same frame, such as in a when_draw callback,
+        and the canvas background covers the drawing again in the next frame.
+        
+        With retained=True, pen calls are kept in a display list until Canvas.clear is called,
+        and drawn on the surface of this canvas only when the list or the background color changes,
+        so a static drawing is made once, outside the main loop, and costs one blit per frame.
+        
         :param size: Canvas size.
         :param bgcolor: Canvas background color.
+        :param retained: Keep drawings in a display list until Canvas.clear, instead of drawing them every frame.
         """
         if not queue:
             raise EasyPlayerSaverError('please create a game first')
@@ -32,6 +429,130 @@ class Canvas(object):
         self.width, self.height = size
         self.rect = pygame.rect.Rect(0, 0, self.width, self.height)
         self.bgcolor = bgcolor
+        self.dirty_tracker = DirtyTracker()
+        self.always_show = False  # Show even when outside the screen
+        
+        self._surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            self._surface = self._surface.convert()
+        self._commands: List[Tuple[Any, ...]] = []
+        self._retained = retained
+        self._target: Optional[pygame.Surface] = None   # Where pens draw in this frame, when not retained
+        self._target_frame: Optional[int] = None
+        self._drawn: Optional[Tuple[Any, Tuple[Tuple[Any, ...], ...]]] = None   # Background and commands drawn
+        self._changed = True
+        self._version = 0   # Counts the times the surface is drawn
+        
+    def __str__(self):
+        return f'Canvas(size={self.rect.size}, commands={len(self)})'
+    
+    def __len__(self):
+        return len(self._commands)
+    
+    def add_command(self, name: str, *args: Any):
+        """
+        Add a command to the display list, see easyplayer.core.widgets.canvas.primitives.
+        
+        When the canvas is not retained, the command is drawn on the screen at once.
+        Arguments must be immutable, so that display lists can be compared.
+        
+        :param name: Command name.
+        :param args: Arguments of the draw function, after the surface.
+        :raise: EasyPlayerCanvasError
+        :return: None
+        """
+        if name not in primitives:
+            raise EasyPlayerCanvasError(f'Unknown canvas command: {name!r}')
+        if not self._retained:
+            self._draw_now(name, args)
+            return
+        self._commands.append((name,) + args)
+        self._changed = True
+        
+    def _draw_now(self, name: str, args: Tuple[Any, ...]):
+        """
+        Draw a command on the screen, when the canvas is not retained.
+        
+        Pens draw on a subsurface of the screen at the canvas rect, made once per frame, so clips last for the frame.
+        A canvas partly outside the screen is drawn on its own surface, which is then blitted.
+        
+        :param name: Command name.
+        :param args: Arguments of the draw function, after the surface.
+        :return: None
+        """
+        screen = self._screen
+        view = screen.get_rect()
+        if not view.colliderect(self.rect):
+            return
+        frame = self._game.frame
+        if self._target_frame != frame:
+            self._target_frame = frame
+            if view.contains(self.rect):
+                self._target = screen.subsurface(self.rect)
+            else:
+                self._target = self._surface
+                self._surface.set_clip(None)
+                self._surface.fill(self.bgcolor)
+        primitives[name](self._target, *args)
+        if self._target is self._surface:
+            screen.blit(self._surface, self.rect)
+        
+    def set_clip(self, rect: Optional[Tuple[int, int, int, int]] = None):
+        """
+        Clip the following drawings to a rect of this canvas.
+        
+        :param rect: Rect in canvas coordinates, None to draw on the whole canvas again.
+        :return: None
+        """
+        self.add_command('clip', None if rect is None else tuple(pygame.Rect(rect)))
+        
+    def clear(self):
+        """
+        Remove all drawings of this canvas, when it is retained.
+        
+        :return: None
+        """
+        self._commands.clear()
+        self._changed = True
+        
+    @property
+    def retained(self):
+        """
+        Whether drawings are kept until Canvas.clear.
+        
+        :return: Whether retained.
+        """
+        return self._retained
+        
+    def render(self):
+        """
+        Draw the display list on the surface of this canvas, if it changed since it was last drawn.
+        
+        :return: Whether the surface was drawn.
+        """
+        drawn = _color(self.bgcolor), tuple(self._commands) if self._changed else self._drawn[1]
+        self._changed = False
+        if drawn == self._drawn:
+            return False
+        self._drawn = drawn
+        surface = self._surface
+        surface.set_clip(None)
+        surface.fill(self.bgcolor)
+        for command in self._commands:
+            primitives[command[0]](surface, *command[1:])
+        surface.set_clip(None)
+        self._version += 1
+        return True
+    
+    @property
+    def surface(self):
+        """
+        The surface of this canvas, drawn with the current display list, when it is retained.
+        
+        :return: The surface, do not keep it, it is drawn again when the display list changes.
+        """
+        self.render()
+        return self._surface
         
     def show(self):
         """
@@ -39,7 +560,12 @@ class Canvas(object):
         
         :return: None
         """
-        draw.rect(self._screen, self.bgcolor, self.rect)
+        if not self._retained:
+            self._screen.fill(self.bgcolor, self.rect)
+            self._target_frame = None   # Pens draw over it from now on
+            return
+        self.render()
+        self._screen.blit(self._surface, self.rect)
     
     @property
     def pos(self):
@@ -65,6 +591,20 @@ class Canvas(object):
     def y(self, set_y: int):
         self.rect.y = set_y
         
+    def dirty_rects(self):
+        """
+        Get the rects this canvas touched or uncovered since it was last drawn.
+        
+        A retained canvas is reported when it moved or its surface was drawn again,
+        otherwise pens draw on it every frame, so it is always reported.
+        
+        :return: A list of rects.
+        """
+        if not self._retained:
+            return self.dirty_tracker.update(self.rect) or [self.rect.copy()]
+        self.render()
+        return self.dirty_tracker.update(self.rect, self._version)
+        
     def init_pen(self):
         """
         Get the pen of this canvas.
@@ -73,13 +613,14 @@ class Canvas(object):
         """
         return Pen(self)
     
-    def pack(self):
+    def pack(self, layer: int = 0):
         """
         Pack this canvas object.
         
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._game.add_sprite(self)
+        self._game.add_sprite(self, layer)
     
     
 class Pen(object):
@@ -87,6 +628,8 @@ class Pen(object):
         """
         Easy Player pen object.
         
+        Draws on its canvas, in canvas coordinates.
+        
         :param canvas: Father canvas.
         :param color: Pen color.
         """
@@ -119,7 +662,7 @@ class Pen(object):
         """
         if fill:
             width = 0
-        draw.circle(self._screen, self.color, center, radius, width=width)
+        self.canvas.add_command('circle', _color(self.color), _point(center), radius, width)
         
     def rect(self, pos: PointType, size: PointType, fill: bool = True, width: int = 1):
         """
@@ -133,8 +676,8 @@ class Pen(object):
         """
         if fill:
             width = 0
-        rect = pygame.rect.Rect(pos, size)
-        draw.rect(self._screen, self.color, rect, width=width)
+        rect = tuple(pygame.rect.Rect(pos, size))
+        self.canvas.add_command('rect', _color(self.color), rect, width)
         
     rectangle = rect
         
@@ -149,8 +692,7 @@ class Pen(object):
         :param antialias: Whether antialias.
         :return: None
         """
-        func = draw.aaline if antialias else draw.line
-        func(self._screen, self.color, start_pos, end_pos, width)
+        self.canvas.add_command('line', _color(self.color), _point(start_pos), _point(end_pos), width, antialias)
 
     def polygon(self, points: List[PointType], fill: bool = True, width: int = 1):
         """
@@ -165,7 +707,7 @@ class Pen(object):
             raise EasyPlayerCanvasError('The number of polygon sides must be greater than 2')
         if fill:
             width = 0
-        draw.polygon(self._screen, self.color, points, width=width)
+        self.canvas.add_command('polygon', _color(self.color), tuple(map(_point, points)), width)
         
     def ellipse(self, pos: PointType, size: PointType, fill: bool = True, width: int = 1):
         """
@@ -179,8 +721,8 @@ class Pen(object):
         """
         if fill:
             width = 0
-        rect = pygame.rect.Rect(pos, size)
-        draw.ellipse(self._screen, self.color, rect, width=width)
+        rect = tuple(pygame.rect.Rect(pos, size))
+        self.canvas.add_command('ellipse', _color(self.color), rect, width)
         
     def triangle(self, point1: PointType, point2: PointType, point3: PointType, fill: bool = True):
         """
@@ -192,13 +734,8 @@ class Pen(object):
         :param fill: Whether to fill.
         :return: None
         """
-        x1, y1 = point1
-        x2, y2 = point2
-        x3, y3 = point3
-        if fill:
-            gfxdraw.filled_trigon(self._screen, x1, y1, x2, y2, x3, y3, self.color)
-        else:
-            gfxdraw.trigon(self._screen, x1, y1, x2, y2, x3, y3, self.color)
+        self.canvas.add_command('triangle', _color(self.color), _point(point1), _point(point2), _point(point3),
+                                bool(fill))
     
     def arc(self, point: PointType, radius: int, start_angel: int, stop_angel: int):
         """
@@ -210,8 +747,7 @@ class Pen(object):
         :param stop_angel: Stop angle in degrees.
         :return: None
         """
-        x, y = point
-        gfxdraw.arc(self._screen, x, y, radius, start_angel, stop_angel, self.color)
+        self.canvas.add_command('arc', _color(self.color), _point(point), radius, start_angel, stop_angel)
         
     def pie(self, point: PointType, radius: int, start_angel: int, stop_angel: int):
         """
@@ -223,8 +759,7 @@ class Pen(object):
         :param stop_angel: Stop angle in degrees.
         :return: None
         """
-        x, y = point
-        gfxdraw.pie(self._screen, x, y, radius, start_angel, stop_angel, self.color)
+        self.canvas.add_command('pie', _color(self.color), _point(point), radius, start_angel, stop_angel)
         
     def bezier(self, points: Sequence[PointType], steps: int = 10):
         """
@@ -234,4 +769,59 @@ class Pen(object):
         :param steps: Number of steps for the interpolation, the minimum is 2.
         :return: None
         """
-        gfxdraw.bezier(self._screen, points, steps, self.color)
+        self.canvas.add_command('bezier', _color(self.color), tuple(map(_point, points)), steps)
+        
+    def points(self, xy: ArrayType, colors: Optional[ArrayType] = None):
+        """
+        Draw many points at once, written straight into the pixels of the canvas.
+        
+        :param xy: Point coordinates, an array of shape (n, 2).
+        :param colors: None for the pen color, one color, or an array of shape (n, 3) or (n, 4), alpha is ignored.
+        :raise: EasyPlayerCanvasError
+        :return: None
+        """
+        xy = np.asarray(xy).reshape(-1, 2).round().astype(np.intp)
+        self.canvas.add_command('points', _Batch(xy, _batch_colors(colors, _color(self.color), len(xy))))
+        
+    def circles(self, centers: ArrayType, radii: Union[int, ArrayType] = 3,
+                colors: Optional[ArrayType] = None, fill: bool = True, width: int = 1):
+        """
+        Draw many circles at once.
+        
+        Circles with the same radius and color are drawn once and blitted in one call,
+        circles out of the canvas are skipped.
+        
+        :param centers: Centre coordinates, an array of shape (n, 2).
+        :param radii: One radius, or an array of shape (n,).
+        :param colors: None for the pen color, one color, or an array of shape (n, 3) or (n, 4), alpha is ignored.
+        :param fill: Whether to fill.
+        :param width: Border width.
+        :raise: EasyPlayerCanvasError
+        :return: None
+        """
+        if fill:
+            width = 0
+        centers = np.asarray(centers).reshape(-1, 2).round().astype(np.intp)
+        radii = np.broadcast_to(np.asarray(radii).round().astype(np.intp), (len(centers),))
+        colors = _batch_colors(colors, _color(self.color), len(centers))
+        self.canvas.add_command('circles', _Batch(centers, radii, colors), width)
+        
+    def lines(self, segments: ArrayType, colors: Optional[ArrayType] = None,
+              width: int = 1, antialias: bool = False):
+        """
+        Draw many lines at once, lines out of the canvas are skipped.
+        
+        Short thin lines without antialias are rasterized together with numpy,
+        other lines are drawn with one call per run of connected lines of the same color,
+        such as a polyline given as segments (p0, p1), (p1, p2)...
+        
+        :param segments: Start and end positions, an array of shape (n, 2, 2) or (n, 4).
+        :param colors: None for the pen color, one color, or an array of shape (n, 3) or (n, 4), alpha is ignored.
+        :param width: Border width.
+        :param antialias: Whether antialias.
+        :raise: EasyPlayerCanvasError
+        :return: None
+        """
+        segments = np.asarray(segments).reshape(-1, 2, 2).round().astype(np.intp)
+        colors = _batch_colors(colors, _color(self.color), len(segments))
+        self.canvas.add_command('lines', _Batch(segments, colors), width, bool(antialias))
@@ -4,12 +4,13 @@ Implemented a simple input box.
 This is the test function, it is unstable!
 """
 
-from typing import Tuple, Callable, Any
+from typing import Tuple, Callable, Any, Optional
 
 import pygame
 
 from easyplayer.core.widgets.label import Label, Font
 from easyplayer.core.saver import queue
+from easyplayer.core.dirty import DirtyTracker
 from easyplayer.exceptions import EasyPlayerSaverError, EasyPlayerTextTooLongError
 from easyplayer.utils.color import ColorType
 
@@ -21,7 +22,7 @@ __all__ = ['Entry']
 
 
 class Entry(object):
-    def __init__(self, default_text: str = '', font: Font = Font(), size: Tuple[int, int] = (140, 32),
+    def __init__(self, default_text: str = '', font: Optional[Font] = None, size: Tuple[int, int] = (140, 32),
                  antialias: bool = True, foreground: ColorType = (0, 0, 0), color_active: ColorType = _color_active,
                  color_inactive: ColorType = _color_inactive, width: int = 2, can_longer: bool = True):
         """
@@ -31,7 +32,7 @@ class Entry(object):
         Warning: this is the test function, it is unstable!
         
         :param default_text: Default text.
-        :param font: Font object, for detailed documents, see easyplayer.core.widgets.label.Font
+        :param font: Font object, for detailed documents, see easyplayer.core.widgets.label.Font. The default font if it is None.
         :param size: Font size.
         :param antialias: Is antialias.
         :param foreground: Foreground text color.
@@ -44,6 +45,8 @@ class Entry(object):
             raise EasyPlayerSaverError('please create a game first')
         self._game = queue[-1]
         self._screen = self._game.screen
+        # Read in show method, SDL gives KEYDOWN its unicode from TEXTINPUT events
+        self._game.allow_events(pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.TEXTINPUT)
         
         self._label = Label(default_text, font, antialias, foreground)
         self.rect = pygame.rect.Rect(0, 0, *size)
@@ -61,6 +64,9 @@ class Entry(object):
         self._when_active = empty_func
         
         self.text = default_text
+        self._handled_frame: Optional[int] = None   # Events are read once per window frame
+        self.dirty_tracker = DirtyTracker()
+        self.always_show = False  # Show even when outside the screen
         
     @property
     def pos(self):
@@ -115,13 +121,25 @@ class Entry(object):
         """
         return self.text
     
-    def pack(self):
+    def dirty_rects(self):
+        """
+        Get the rects this entry touched or uncovered since it was last drawn.
+        
+        Used by the dirty rectangle render mode of the window.
+        
+        :return: A list of rects.
+        """
+        return self.dirty_tracker.update(self.rect.union(self._label.rect), self.text,
+                                         tuple(self._color), self._width)
+    
+    def pack(self, layer: int = 0):
         """
         Pack this entry object.
         
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._game.add_sprite(self)
+        self._game.add_sprite(self, layer)
         
     def show(self):
         """
@@ -142,10 +160,13 @@ class Entry(object):
                 raise EasyPlayerTextTooLongError('Input too long')
         pygame.draw.rect(self._screen, self._color, self.rect, self._width)
         
+        if self._handled_frame == self._game.frame:   # Shown again in another dirty rect
+            return
+        self._handled_frame = self._game.frame
         event = self._game.event
         
         if event.mouse_down:
-            if self.rect.collidepoint(self._game.mouse.pos):
+            if self.rect.collidepoint(event.mouse_pos):   # Not the live mouse, so replays click the same place
                 self.active = not self.active
             else:
                 self.active = False
@@ -2,14 +2,17 @@
 Easy Player label widget and font class.
 """
 
-from typing import Union, Tuple, Callable, Any
+from typing import Union, Tuple, Callable, Any, Optional
 
 import pygame
 
 from easyplayer.core.saver import queue
+from easyplayer.core.dirty import DirtyTracker
+from easyplayer.core.collide import get_collide
+from easyplayer.core.text import text_cache, font_registry
 from easyplayer.exceptions import EasyPlayerSaverError
 
-__all__ = ['Font', 'Label']
+__all__ = ['Font', 'Label', 'get_default_font']
 
 
 class Font(object):
@@ -20,11 +23,32 @@ class Font(object):
         
         Support TTF, OTF and EOT.
         
+        The file is loaded on first use, and only once for all Font objects with the same file and size,
+        see easyplayer.core.text.font_registry.
+        
         :param font_path: Font file path.
         :param size: Font size.
         """
-        pygame.font.init()
-        self.font = pygame.font.Font(font_path, size)
+        self._load = lambda: font_registry.get(font_path, size)
+        self._font: Optional[pygame.font.Font] = None
+        
+    def __str__(self):
+        return f'Font(font={self._font})'
+    
+    @property
+    def font(self):
+        """
+        The shared pygame font, loaded on first use.
+        
+        :return: Pygame font.
+        """
+        if self._font is None:
+            self._font = self._load()
+        return self._font
+    
+    @font.setter
+    def font(self, set_font: pygame.font.Font):
+        self._font = set_font
         
     @staticmethod
     def from_system(name: str, size: int = 25, bold: bool = False, italic: bool = False):
@@ -38,7 +62,7 @@ class Font(object):
         :return: A Font object from this system font.
         """
         res = Font()
-        res.font = pygame.font.SysFont(name, size, bold, italic)
+        res._load = lambda: font_registry.get_system(name, size, bold, italic)
         return res
     
     @staticmethod
@@ -51,19 +75,38 @@ class Font(object):
         return pygame.font.get_fonts()
 
 
+_default_font: Optional[Font] = None
+
+
+def get_default_font():
+    """
+    Get the font used by labels and entries without a font, created on first use.
+    
+    :return: The default Font object.
+    """
+    global _default_font
+    if _default_font is None:
+        _default_font = Font()
+    return _default_font
+
+
 class Label(pygame.sprite.Sprite):
-    def __init__(self, text: str = '', font: Font = Font(), antialias: bool = True,
-                 color: Union[Tuple[int, int, int], Tuple[int, int, int, int], pygame.color.Color] = (0, 0, 0)):
+    def __init__(self, text: str = '', font: Optional[Font] = None, antialias: bool = True,
+                 color: Union[Tuple[int, int, int], Tuple[int, int, int, int], pygame.color.Color] = (0, 0, 0),
+                 numeric: bool = False):
         """
         Easy Player label widget.
         
         It inherit pygame.sprite.Sprite.
         This means that it has good compatibility with pygame.
         
+        Rendered texts are shared through easyplayer.core.text.text_cache, copy the image before drawing on it.
+        
         :param text: Label text.
-        :param font: The font of this label.
+        :param font: The font of this label, the default font if it is None.
         :param antialias: Whether antialias.
         :param color: The color of the text.
+        :param numeric: Draw digits from a glyph atlas, for texts that change often, such as scores and timers.
         """
         super().__init__()
         if not queue:
@@ -71,13 +114,19 @@ class Label(pygame.sprite.Sprite):
         self._game = queue[-1]
         self._screen = self._game.screen
         
-        self.font = font
+        self.font = get_default_font() if font is None else font
         self.text = str(text)
         self.color = color
         self.antialias = antialias
+        self.numeric = numeric
+        self._rendered = None
+        self._atlas = None
+        self._atlas_style = None
         self._init()
         
         self.update = self.show
+        self.dirty_tracker = DirtyTracker()
+        self.always_show = False  # Show even when outside the screen
         
         _empty_func = lambda: None
         self._when_click_me = _empty_func
@@ -91,7 +140,7 @@ class Label(pygame.sprite.Sprite):
         
         :return: A same label object.
         """
-        res = Label(self.text, self.font, self.antialias, self.color)
+        res = Label(self.text, self.font, self.antialias, self.color, self.numeric)
         res.image = self.image.copy()
         res.rect = self.rect.copy()
         return res
@@ -99,8 +148,17 @@ class Label(pygame.sprite.Sprite):
     copy = clone = __copy__
     
     def _init(self):
-        self.image = self.font.font.render(self.text, self.antialias, self.color)
+        font = self.font.font
+        if self.numeric:
+            style = font, self.antialias, self.color
+            if self._atlas_style != style:
+                self._atlas = text_cache.atlas(*style)
+                self._atlas_style = style
+            self.image = text_cache.render_numeric(font, self.text, self.antialias, self.color, self._atlas)
+        else:
+            self.image = text_cache.render(font, self.text, self.antialias, self.color)
         self.rect = self.image.get_rect()
+        self._rendered = self.text, self.font, self.antialias, self.color
 
     @property
     def pos(self):
@@ -130,21 +188,36 @@ class Label(pygame.sprite.Sprite):
         """
         A decorator to decorate a callback function when click this label.
 
+        The window hit-tests clickable widgets when the mouse is pressed,
+        and only the topmost packed widget under the mouse is clicked.
+
         :param func: Callback function.
         :return: None
         """
         self._when_click_me = func
+        self._game.add_clickable(self)
+
+    def click(self):
+        """
+        Call the click callback of this label.
+
+        :return: None
+        """
+        self._when_click_me()
 
-    def collide_other(self, sprite: pygame.sprite.Sprite):
+    def collide_other(self, sprite: pygame.sprite.Sprite, mode: str = 'rect'):
         """
         Determine whether it collides with other sprite.
 
-        Warning: Collision detection method rectangular object based on sprite. Possible error.
+        Warning: Rect mode is based on the rectangles of the sprites. Possible error.
+        Use mask mode for pixel-perfect collision, the masks are cached.
 
         :param sprite: Other sprite.
+        :param mode: Collide mode, 'rect', 'circle' or 'mask'.
+        :raise: EasyPlayerCollideError
         :return: Whether it collides with other sprite.
         """
-        return pygame.sprite.collide_rect(self, sprite)
+        return get_collide(mode)(self, sprite)
 
     def collide_mouse(self):
         """
@@ -176,25 +249,38 @@ class Label(pygame.sprite.Sprite):
         :return: None
         """
         self._screen.blit(self.image, self.rect)
-        if self.collide_mouse() and self._game.event.mouse_down:
-            self._when_click_me()
 
-    def pack(self):
+    def dirty_rects(self):
+        """
+        Get the rects this label touched or uncovered since it was last drawn.
+        
+        Used by the dirty rectangle render mode of the window.
+        
+        :return: A list of rects.
+        """
+        return self.dirty_tracker.update(self.rect, self.image)
+
+    def pack(self, layer: int = 0):
         """
         Pack this label object.
         
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._game.add_sprite(self)
+        self._game.add_sprite(self, layer)
         
     def set_text(self, text: str):
         """
         Set the text of this label.
         
+        Nothing is rendered when the text and the style are unchanged.
+        
         :param text: Text content.
         :return: None
         """
         self.text = str(text)
+        if self._rendered == (self.text, self.font, self.antialias, self.color):
+            return
         rct = self.rect.copy()
         self._init()
         self.rect.x, self.rect.y = rct.x, rct.y
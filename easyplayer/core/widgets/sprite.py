@@ -8,22 +8,30 @@ from typing import Optional, Tuple, Callable, Any
 import pygame
 
 from easyplayer.core.saver import queue
+from easyplayer.core.dirty import DirtyTracker
+from easyplayer.core.collide import get_collide
+from easyplayer.core.cache import image_cache, rotation_cache
 from easyplayer.exceptions import EasyPlayerSaverError
 
 __all__ = ['Sprite']
 
 
 class Sprite(pygame.sprite.Sprite):
-    def __init__(self, image: str, size: Optional[Tuple[int, int]] = None, convert_alpha: bool = False):
+    def __init__(self, image: str, size: Optional[Tuple[int, int]] = None, convert_alpha: bool = False,
+                 prebuild_rotations: bool = False):
         """
         Basic role component class.
         
         It inherit pygame.sprite.Sprite.
         This means that it has good compatibility with pygame.
         
+        The image is loaded through easyplayer.core.cache.image_cache, converted to the display pixel format
+        and shared with other sprites, so copy it before drawing on it.
+        
         :param image: Image path, support JPEG, PNG, GIF, BMP, PCX, TGA, TIF, LBM, PBM, XPM, SVG, WEBP
         :param size: If this parameter is set, the size of the picture is automatically scaled.
-        :param convert_alpha: Convert to RGBA.
+        :param convert_alpha: Convert to RGBA even if the image has no per-pixel alpha.
+        :param prebuild_rotations: Rotate the image to every angle of easyplayer.core.cache.rotation_cache in advance.
         """
         super().__init__()
         if not queue:
@@ -33,17 +41,20 @@ class Sprite(pygame.sprite.Sprite):
         self._screen_rect = self._screen.get_rect()
         self._path = image
         self._angle = 0
+        self._size = size
+        self._convert_alpha = convert_alpha
         
-        self.image = pygame.image.load(image)
-        if size:
-            self.image = pygame.transform.scale(self.image, size)  # Auto scale
-        if convert_alpha:
-            self.image = self.image.convert_alpha()
+        self.image = image_cache.load(image, size, convert_alpha)  # Auto scale and convert
+        self._original = self.image  # Rotate from the pristine image
+        if prebuild_rotations:
+            rotation_cache.prebuild(self._original)
             
         self.rect = self.image.get_rect()
         self.size = (self.rect.width, self.rect.height)
         self.width, self.height = self.size
         self.update = self.show
+        self.dirty_tracker = DirtyTracker()
+        self.always_show = False  # Show even when outside the screen
         
         _empty_func = lambda: None
         self._when_click_me = _empty_func
@@ -57,9 +68,10 @@ class Sprite(pygame.sprite.Sprite):
         
         :return: A clone.
         """
-        sprite = Sprite(image=self._path, size=self.size)
+        sprite = Sprite(image=self._path, size=self._size, convert_alpha=self._convert_alpha)
         sprite.rect = self.rect.copy()
-        sprite.image = self.image.copy()
+        sprite.image = self.image  # Images are shared, not copied
+        sprite._angle = self._angle
         return sprite
     
     clone = copy = __copy__
@@ -100,34 +112,54 @@ class Sprite(pygame.sprite.Sprite):
         """
         Counterclockwise rotation.
         
+        The original image is rotated to the angle around the center of this sprite.
+        Rotated images come from easyplayer.core.cache.rotation_cache,
+        so the angle of the image is quantized to its step.
+        
         :param angle: Angle.
         :param image_rotate: Rotate image.
         :return: None
         """
         self._angle = angle
         if image_rotate:
-            self.image = pygame.transform.rotate(self.image, angle)
-            self.rect = self.image.get_rect()
+            center = self.rect.center
+            self.image = rotation_cache.rotate(self._original, angle)
+            self.rect = self.image.get_rect(center=center)
         
     def when_click_me(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when click this sprite.
 
+        The window hit-tests clickable widgets when the mouse is pressed,
+        and only the topmost packed widget under the mouse is clicked.
+
         :param func: Callback function.
         :return: None
         """
         self._when_click_me = func
+        self._game.add_clickable(self)
+
+    def click(self):
+        """
+        Call the click callback of this sprite.
+
+        :return: None
+        """
+        self._when_click_me()
         
-    def collide_other(self, sprite: pygame.sprite.Sprite):
+    def collide_other(self, sprite: pygame.sprite.Sprite, mode: str = 'rect'):
         """
         Determine whether it collides with other sprite.
         
-        Warning: Collision detection method rectangular object based on sprite. Possible error.
+        Warning: Rect mode is based on the rectangles of the sprites. Possible error.
+        Use mask mode for pixel-perfect collision, the masks are cached.
         
         :param sprite: Other sprite.
+        :param mode: Collide mode, 'rect', 'circle' or 'mask'.
+        :raise: EasyPlayerCollideError
         :return: Whether it collides with other sprite.
         """
-        return pygame.sprite.collide_rect(self, sprite)
+        return get_collide(mode)(self, sprite)
     
     def collide_mouse(self):
         """
@@ -199,16 +231,25 @@ class Sprite(pygame.sprite.Sprite):
         :return: None
         """
         self._screen.blit(self.image, self.rect)
-        if self.collide_mouse() and self._game.event.mouse_down:
-            self._when_click_me()
             
-    def pack(self):
+    def dirty_rects(self):
+        """
+        Get the rects this sprite touched or uncovered since it was last drawn.
+        
+        Used by the dirty rectangle render mode of the window.
+        
+        :return: A list of rects.
+        """
+        return self.dirty_tracker.update(self.rect, self.image)
+            
+    def pack(self, layer: int = 0):
         """
         Pack this sprite object.
         
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._game.add_sprite(self)
+        self._game.add_sprite(self, layer)
         
     def forward(self, length: int):
         """
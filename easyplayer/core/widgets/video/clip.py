@@ -4,10 +4,18 @@ This is tool module for playing video.
 Need numpy, opencv-python and tqdm.
 """
 
+import json
+import os
+import struct
+import threading
+from bisect import bisect_right
+from queue import Queue, Empty, Full
+from typing import List, Optional, Tuple
+
 import numpy as np
 import pygame
 
-from easyplayer.exceptions import EasyPlayerModuleError
+from easyplayer.exceptions import EasyPlayerModuleError, EasyPlayerVideoError
 
 try:
     import cv2
@@ -30,45 +38,566 @@ except ImportError:
     tqdm = _raise_error
     
     
-__all__ = ['video2images', 'get_fps']
+__all__ = ['video2images', 'get_fps', 'VideoStream', 'FrameConverter', 'KeyframeIndex', 'RawFrameCache']
+
+
+def _bgr_supported():
+    """
+    Check whether pygame can wrap BGR buffers, which it can since pygame 2.1.3.
     
+    :return: Whether pygame.image.frombuffer supports the BGR format.
+    """
+    try:
+        pygame.image.frombuffer(b'\0\0\0', (1, 1), 'BGR')
+    except ValueError:
+        return False
+    return True
+
+
+_FORMAT = 'BGR' if _bgr_supported() else 'RGB'   # Without BGR, channels are swapped by OpenCV
+
+
+class FrameConverter(object):
+    def __init__(self, size: Optional[Tuple[int, int]] = None, slots: int = 0):
+        """
+        Easy Player video frame converter.
+        
+        Wraps the BGR buffers of OpenCV frames in pygame surfaces with pygame.image.frombuffer, without copying.
+        The surfaces are 24-bit, so a blit onto the display converts them,
+        frames that are blitted many times should be converted once with Surface.convert.
+        Scaling is a single cv2.resize pass, into the buffer of the surface.
+        
+        With slots, surfaces and their buffers are allocated once and reused in turn,
+        so a surface is overwritten after slots more frames are converted.
+        Without slots, every frame gets its own surface, which keeps the frame buffer alive.
+        
+        :param size: If this parameter is set, frames are scaled.
+        :param slots: Number of reused surfaces, 0 for a new surface per frame.
+        """
+        self._size = tuple(size) if size else None
+        self._count = slots
+        self._slots: List[Tuple[np.ndarray, pygame.Surface]] = []
+        self._next = 0
+        self._decode: Optional[np.ndarray] = None   # Reused decode buffer, when scaling into slots
+        
+    def __str__(self):
+        return f'FrameConverter(size={self._size}, slots={self._count})'
     
-def video2images(video_path: str, progress_bar: bool = True):
+    def read(self, cap):
+        """
+        Read the next frame of a cv2.VideoCapture, into a reused buffer when possible.
+        
+        :param cap: The capture.
+        :return: The frame, None at the end of the video.
+        """
+        if not self._count:
+            target = None
+        elif self._size:
+            target = self._decode
+        else:
+            target = self._slots[self._next][0] if self._slots else None   # Decode into the next surface
+        ret, frame = cap.read(target) if target is not None else cap.read()
+        if not ret or frame is None:
+            return None
+        if self._count and self._size:
+            self._decode = frame
+        return frame
+        
+    def _take_slot(self, size: Tuple[int, int]):
+        """
+        Get the next reused buffer and surface.
+        
+        :param size: Surface size.
+        :return: The buffer and the surface wrapping it.
+        """
+        if not self._slots or self._slots[0][1].get_size() != size:
+            self._slots = []
+            for _ in range(self._count):
+                buffer = np.empty((size[1], size[0], 3), np.uint8)
+                self._slots.append((buffer, pygame.image.frombuffer(buffer, size, _FORMAT)))
+            self._next = 0
+        slot = self._slots[self._next]
+        self._next = (self._next + 1) % self._count
+        return slot
+        
+    def convert(self, frame: np.ndarray):
+        """
+        Convert a frame read by OpenCV to a pygame surface.
+        
+        :param frame: BGR frame of shape (height, width, 3).
+        :return: pygame.Surface object.
+        """
+        height, width = frame.shape[:2]
+        size = self._size or (width, height)
+        if not self._count:
+            if size != (width, height):
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            if _FORMAT == 'RGB':
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            return pygame.image.frombuffer(np.ascontiguousarray(frame), size, _FORMAT)
+        
+        buffer, surface = self._take_slot(size)
+        if frame is not buffer:   # Decoded somewhere else
+            if size != (width, height):
+                cv2.resize(frame, size, dst=buffer, interpolation=cv2.INTER_AREA)
+            else:
+                np.copyto(buffer, frame)
+        if _FORMAT == 'RGB':
+            cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB, dst=buffer)
+        return surface
+
+
+def video2images(video_path: str, progress_bar: bool = True, size: Optional[Tuple[int, int]] = None):
     """
     Decomposing video into picture sets.
     Save to pygame.Surface object list.
-    Memory errors may occur when the video is too large.
+    Memory errors may occur when the video is too large, use VideoStream instead.
+    
+    Frames are kept and blitted again on every loop, so once a display is set,
+    each one is copied to the display pixel format when it is decoded.
     
     :param video_path: Video path.
     :param progress_bar: Whether to display terminal progress bar.
+    :param size: If this parameter is set, frames are scaled while decoding.
     :raise: MemoryError
     :return: pygame.Surface object list.
     """
     cap = cv2.VideoCapture(video_path)
     frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
     bar = tqdm.tqdm(total=int(frames)) if progress_bar else None  # Create tqdm to show progress bar
+    converter = FrameConverter(size)
+    display = pygame.display.get_surface() is not None   # Surface.convert needs a display
     res = []
     while cap.isOpened():
         ret, frame = cap.read()
         if frame is not None:
-            frame = np.fliplr(np.fliplr(cv2.transpose(frame)))   # Mirror horizontally twice after flipping
-            surface = pygame.surfarray.make_surface(frame)
-            res.append(surface)
+            surface = converter.convert(frame)
+            res.append(surface.convert() if display else surface)   # 24-bit frames are converted on every blit
         if progress_bar:
             bar.update()
         if not ret:
             break
     cap.release()  # Release video
-    cv2.destroyAllWindows()
     return res
     
 
-def get_fps(video_path: str):
+def get_fps(video_path: str, exact: bool = False):
     """
     Get a video's FPS.
     
     :param video_path: Video path.
+    :param exact: Return the FPS as a float, such as 29.97, instead of an int.
     :return: This video's FPS.
     """
     cap = cv2.VideoCapture(video_path)
-    return int(cap.get(cv2.CAP_PROP_FPS))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return fps if exact else int(fps)
+
+
+class KeyframeIndex(object):
+    VERSION = 1
+    
+    def __init__(self, fps: float, times: List[float], keyframes: Optional[List[int]]):
+        """
+        Easy Player video keyframe index.
+        
+        The presentation time of every frame and the frames decoding can start from.
+        Use KeyframeIndex.load to build it once per file and keep it in a sidecar file.
+        
+        :param fps: Video FPS.
+        :param times: Presentation time of every frame, in seconds.
+        :param keyframes: Keyframe numbers, None if OpenCV cannot tell keyframes, then OpenCV seeks by itself.
+        """
+        self.fps = fps
+        self.times = times
+        self.keyframes = keyframes
+        
+    def __str__(self):
+        keyframes = None if self.keyframes is None else len(self.keyframes)
+        return f'KeyframeIndex(frames={len(self)}, keyframes={keyframes})'
+    
+    def __len__(self):
+        return len(self.times)
+    
+    @staticmethod
+    def sidecar_path(video_path: str):
+        """
+        Get the path of the sidecar file of a video.
+        
+        :param video_path: Video path.
+        :return: Sidecar path.
+        """
+        return video_path + '.epidx'
+    
+    @staticmethod
+    def _stamp(video_path: str):
+        """
+        Get what tells whether a video changed since it was indexed.
+        
+        :param video_path: Video path.
+        :return: Size and modification time.
+        """
+        stat = os.stat(video_path)
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    @classmethod
+    def build(cls, video_path: str):
+        """
+        Build the index of a video, reading every frame once without converting it.
+        
+        :param video_path: Video path.
+        :return: The index.
+        """
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_type = getattr(cv2, 'CAP_PROP_FRAME_TYPE', None)   # OpenCV 4.7 and later
+        times = []
+        keyframes = []
+        while cap.grab():
+            times.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+            if frame_type is not None and cap.get(frame_type) == ord('I'):
+                keyframes.append(len(times) - 1)
+        cap.release()
+        if not keyframes or keyframes[0] != 0:
+            keyframes = None
+        return cls(fps, times, keyframes)
+    
+    @classmethod
+    def load(cls, video_path: str):
+        """
+        Load the index of a video from its sidecar file, or build it and save the sidecar file.
+        
+        The sidecar file is built again when the video changes, and not saved when the folder is read-only.
+        
+        :param video_path: Video path.
+        :return: The index.
+        """
+        sidecar = cls.sidecar_path(video_path)
+        stamp = cls._stamp(video_path)
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data['version'] == cls.VERSION and data['stamp'] == stamp:
+                return cls(data['fps'], data['times'], data['keyframes'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        index = cls.build(video_path)
+        data = {'version': cls.VERSION, 'stamp': stamp, 'fps': index.fps,
+                'times': index.times, 'keyframes': index.keyframes}
+        try:
+            with open(sidecar, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+        return index
+    
+    def frame_at(self, seconds: float):
+        """
+        Get the frame shown at a time.
+        
+        :param seconds: Time in seconds.
+        :return: Frame number.
+        """
+        if not self.times:
+            return 0
+        return max(0, min(bisect_right(self.times, seconds + 1e-6) - 1, len(self.times) - 1))
+    
+    def keyframe_before(self, frame: int):
+        """
+        Get the nearest keyframe at or before a frame.
+        
+        :param frame: Frame number.
+        :return: Keyframe number, None if keyframes are unknown.
+        """
+        if self.keyframes is None:
+            return None
+        return self.keyframes[max(bisect_right(self.keyframes, frame) - 1, 0)]
+
+
+class VideoStream(object):
+    def __init__(self, video_path: str, size: Optional[Tuple[int, int]] = None, buffer_size: int = 8):
+        """
+        Easy Player streaming video decoder.
+        
+        A background thread decodes the video and keeps at most buffer_size ready-to-blit frames,
+        so memory does not grow with the length of the video, and playback starts at the first frame.
+        Surfaces are reused, a frame is overwritten buffer_size + 2 reads after it was read.
+        
+        Seeking uses the keyframe index of the video, built on the first seek, see KeyframeIndex.load,
+        so decoding starts from the nearest keyframe.
+        
+        :param video_path: Video path.
+        :param size: If this parameter is set, frames are scaled while decoding.
+        :param buffer_size: Most decoded frames kept.
+        """
+        self._path = video_path
+        self._size = size
+        self._index: Optional[KeyframeIndex] = None
+        self._buffer: Queue = Queue(max(buffer_size, 1))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[Exception] = None   # Raised by the decoder thread, re-raised from read
+        self.finished = False
+        
+        cap = cv2.VideoCapture(video_path)
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        
+    def __str__(self):
+        return f'VideoStream(path={self._path!r}, fps={self.fps}, frames={self.frame_count})'
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        
+    def _put(self, item):
+        """
+        Put an item in the buffer, waiting while it is full.
+        
+        :param item: A decoded frame, or None at the end.
+        :return: Whether it was put, False if the stream is stopped.
+        """
+        while not self._stop.is_set():
+            try:
+                self._buffer.put(item, timeout=0.05)
+                return True
+            except Full:
+                continue
+        return False
+        
+    @property
+    def index(self):
+        """
+        The keyframe index of this video, loaded or built on first use.
+        
+        :return: The index.
+        """
+        if self._index is None:
+            self._index = KeyframeIndex.load(self._path)
+        return self._index
+    
+    def _seek(self, cap, frame: int):
+        """
+        Move a capture to a frame, decoding from the nearest keyframe before it.
+        
+        :param cap: The capture.
+        :param frame: Frame number.
+        :return: None
+        """
+        keyframe = self.index.keyframe_before(frame)
+        if keyframe is None:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame)
+            return
+        if keyframe:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+        for _ in range(frame - keyframe):   # Decoded, not converted
+            if self._stop.is_set() or not cap.grab():
+                break
+        
+    def _decode(self, start: int = 0):
+        """
+        Decoder thread.
+        
+        :param start: First frame.
+        :return: None
+        """
+        cap = cv2.VideoCapture(self._path)
+        converter = FrameConverter(self._size, self._buffer.maxsize + 2)   # Buffered, shown and being decoded
+        index = start
+        try:
+            if start:
+                self._seek(cap, start)
+            while not self._stop.is_set():
+                frame = converter.read(cap)
+                if frame is None:
+                    break
+                if not self._put((index, converter.convert(frame))):
+                    return
+                index += 1
+        except Exception as err:
+            self._error = err
+        finally:
+            cap.release()
+            self._put(None)   # Readers waiting for a frame must always wake up
+        
+    def start(self, frame: int = 0):
+        """
+        Start decoding from a frame, it stops decoding first if it is running.
+        
+        :param frame: First frame.
+        :return: None
+        """
+        self.stop()
+        self._stop.clear()
+        self._error = None
+        self.finished = False
+        if frame and self._index is None:   # Load the index here, not in the decoder thread
+            self._index = KeyframeIndex.load(self._path)
+        self._thread = threading.Thread(target=self._decode, args=(frame,), daemon=True)
+        self._thread.start()
+        
+    def stop(self):
+        """
+        Stop decoding and drop the decoded frames.
+        
+        :return: None
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        while True:
+            try:
+                self._buffer.get_nowait()
+            except Empty:
+                break
+        
+    def read(self, timeout: Optional[float] = 0.0):
+        """
+        Get the next decoded frame.
+        
+        If decoding failed, the error is raised once the frames decoded before it are read.
+        
+        :param timeout: Seconds to wait for the decoder, None to wait until a frame is decoded.
+        :raise: EasyPlayerVideoError
+        :return: (frame index, pygame.Surface), None if no frame is ready or the video has ended, see finished.
+        """
+        if self.finished:
+            return None
+        try:
+            item = self._buffer.get(timeout=timeout) if timeout != 0 else self._buffer.get_nowait()
+        except Empty:
+            return None
+        if item is None:
+            self.finished = True
+            if self._error is not None:
+                err, self._error = self._error, None
+                raise EasyPlayerVideoError(f'Failed to decode {self._path}: {err}') from err
+        return item
+
+
+class RawFrameCache(object):
+    MAGIC = b'EPRF'
+    VERSION = 1
+    # Magic, version, width, height, frame count, FPS, source size, source modification time
+    HEADER = struct.Struct('<4sHIIIdQQ')
+    OFFSET = 64  # Frames start here
+    
+    def __init__(self, cache_path: str):
+        """
+        Easy Player raw video frame cache.
+        
+        A file of decoded RGB frames with a fixed stride after a 64 byte header,
+        memory-mapped with numpy.memmap, so that opening it decodes nothing,
+        and the OS reads frames from disk when they are shown.
+        Use RawFrameCache.open to transcode a video once and reuse the file afterwards.
+        
+        It is a sequence of surfaces, as Video.images is.
+        The surfaces wrap the mapped file, they are read-only.
+        
+        :param cache_path: Cache file path.
+        :raise: EasyPlayerVideoError
+        """
+        self.path = cache_path
+        with open(cache_path, 'rb') as f:
+            header = f.read(self.HEADER.size)
+        if len(header) < self.HEADER.size:
+            raise EasyPlayerVideoError(f'Not a frame cache: {cache_path!r}')
+        magic, version, width, height, count, fps, *stamp = self.HEADER.unpack(header)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise EasyPlayerVideoError(f'Not a frame cache: {cache_path!r}')
+        self.size = width, height
+        self.fps = fps
+        self.stamp = stamp
+        self._frames = np.memmap(cache_path, np.uint8, 'r', offset=self.OFFSET,
+                                 shape=(count, height, width, 3)) if count else np.empty((0, height, width, 3), np.uint8)
+        
+    def __str__(self):
+        return f'RawFrameCache(path={self.path!r}, size={self.size}, frames={len(self)})'
+    
+    def __len__(self):
+        return len(self._frames)
+    
+    def __getitem__(self, index: int):
+        return pygame.image.frombuffer(self._frames[index], self.size, 'RGB')
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    @staticmethod
+    def default_path(video_path: str, size: Optional[Tuple[int, int]] = None):
+        """
+        Get the default cache path of a video, next to it.
+        
+        :param video_path: Video path.
+        :param size: Scaled size.
+        :return: Cache path.
+        """
+        return video_path + (f'.{size[0]}x{size[1]}' if size else '') + '.eprf'
+    
+    @classmethod
+    def transcode(cls, video_path: str, cache_path: str, size: Optional[Tuple[int, int]] = None):
+        """
+        Decode a video once and save its frames.
+        
+        :param video_path: Video path.
+        :param cache_path: Cache file path.
+        :param size: If this parameter is set, frames are scaled.
+        :return: The cache.
+        """
+        stat = os.stat(video_path)
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width = height = count = 0
+        temp_path = cache_path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(b'\0' * cls.OFFSET)
+                while True:
+                    ret, frame = cap.read()
+                    if not ret or frame is None:
+                        break
+                    if size and tuple(size) != (frame.shape[1], frame.shape[0]):
+                        frame = cv2.resize(frame, tuple(size), interpolation=cv2.INTER_AREA)
+                    if not count:
+                        height, width = frame.shape[:2]
+                    elif frame.shape[:2] != (height, width):
+                        raise EasyPlayerVideoError('Frame size changes in the video, set size')
+                    f.write(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).tobytes())
+                    count += 1
+                f.seek(0)
+                f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, width, height, count, fps,
+                                        stat.st_size, stat.st_mtime_ns))
+            os.replace(temp_path, cache_path)   # A cache file is complete or absent
+        finally:
+            cap.release()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return cls(cache_path)
+    
+    @classmethod
+    def open(cls, video_path: str, size: Optional[Tuple[int, int]] = None, cache_path: Optional[str] = None):
+        """
+        Open the frame cache of a video, transcoding it when the cache is missing or older than the video.
+        
+        :param video_path: Video path.
+        :param size: If this parameter is set, frames are scaled.
+        :param cache_path: Cache file path, next to the video by default.
+        :return: The cache.
+        """
+        if cache_path is None:
+            cache_path = cls.default_path(video_path, size)
+        stat = os.stat(video_path)
+        try:
+            cache = cls(cache_path)
+            if cache.stamp == [stat.st_size, stat.st_mtime_ns] and (not size or cache.size == tuple(size)):
+                return cache
+        except (OSError, ValueError, EasyPlayerVideoError):
+            pass
+        return cls.transcode(video_path, cache_path, size)
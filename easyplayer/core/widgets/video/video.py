@@ -4,27 +4,38 @@ Easy Player video widget module.
 Warning: this is the test function, it is unstable!
 """
 
+import time
 from typing import Optional, Tuple
+from warnings import warn
 
 import pygame
 
 from easyplayer.core.saver import queue
-from easyplayer.exceptions import EasyPlayerSaverError
-from easyplayer.core.widgets.video.clip import video2images, get_fps
+from easyplayer.exceptions import EasyPlayerSaverError, EasyPlayerWarning
+from easyplayer.core.widgets.video.clip import video2images, get_fps, VideoStream, RawFrameCache
 
 __all__ = ['Video']
     
 
 class Video(object):
     def __init__(self, video: str, size: Optional[Tuple[int, int]] = None,
-                 progress_bar: bool = True, set_fps: bool = True):
+                 progress_bar: bool = True, set_fps: bool = False, stream: bool = False, buffer_size: int = 8,
+                 cache: bool = False, cache_path: Optional[str] = None):
         """
         Easy Player video widget.
         Provides simple video playback.
         
         Implementation method:
         1. Decomposing video into picture sets, read all into memory (Memory errors may occur when the video is too large).
-        2. Play frame by frame (May lead to a large number of resource losses.)
+        2. Show the frame of the current presentation time, whatever the window FPS is.
+        Frames are dropped when the window is slower than the video, and repeated when it is faster.
+        
+        With stream=True, a background thread decodes the video into a buffer of buffer_size frames instead.
+        Memory does not grow with the video length, and playback starts as soon as the first frame is decoded.
+        
+        With cache=True, the video is decoded once into a raw frame file at the player size,
+        and later runs map that file instead of decoding, see easyplayer.core.widgets.video.clip.RawFrameCache.
+        It suits short clips, such as looping menu backgrounds, as raw frames take much more disk than the video.
         
         Warning: this is the test function, it is unstable!
         
@@ -32,7 +43,11 @@ class Video(object):
         AVI(WMV9), AVI(VP6), MKV, OGG, MP4
         :param size: Video player size.
         :param progress_bar: Whether to display terminal progress bar.
-        :param set_fps: Whether to automatically set window's FPS as video's FPS.
+        :param set_fps: Deprecated and ignored, the window FPS is not changed, playback follows its own clock.
+        :param stream: Decode while playing instead of reading the whole video into memory.
+        :param buffer_size: Most decoded frames kept when streaming.
+        :param cache: Play from a raw frame cache file, made on first use. It takes precedence over stream.
+        :param cache_path: Cache file path, next to the video by default.
         """
         if not queue:
             raise EasyPlayerSaverError('please created a game first')
@@ -40,14 +55,26 @@ class Video(object):
         self._screen = self._game.screen
         
         if set_fps:
-            fps = get_fps(video)
-            self._game.set_fps(fps)
+            warn(EasyPlayerWarning('set_fps is ignored, videos play at their own speed whatever the window FPS is'))
         
-        self.images = video2images(video, progress_bar)
-        if size:
-            self.images = [pygame.transform.scale(i, size) for i in self.images]
+        self._stream: Optional[VideoStream] = None
+        self._image: Optional[pygame.Surface] = None
+        self._start: Optional[float] = None
+        if cache:
+            self.images = RawFrameCache.open(video, size, cache_path)   # Frames are read from disk when shown
+            self.fps = self.images.fps
+        elif stream:
+            self._stream = VideoStream(video, size, buffer_size)
+            self._stream.start()   # Fill the buffer before the first frame is shown
+            self.images = []
+            self.fps = self._stream.fps
+        else:
+            self.images = video2images(video, progress_bar, size)   # Scaled while decoding
+            self.fps = get_fps(video, exact=True) or 30.0
         self.index = 0
         self.loops = 0
+        self.dropped_frames = 0   # Frames skipped because the window was too slow
+        self.repeated_frames = 0   # Window frames showing the same video frame again
         
         self.x, self.y = 0, 0
         
@@ -59,13 +86,132 @@ class Video(object):
     def pos(self, set_pos: Tuple[int, int]):
         self.x, self.y = set_pos
         
+    @property
+    def streaming(self):
+        """
+        Whether this video is decoded while playing.
+        
+        :return: Whether it is streaming.
+        """
+        return self._stream is not None
+    
+    def _restart_stream(self, frame: Optional[int] = None):
+        """
+        Play the stream from a frame, waiting for it to be decoded.
+        
+        :param frame: Frame number, None to go on with the decoded frames, or from the first frame at the end.
+        :return: None
+        """
+        if frame is not None:
+            self._stream.start(frame)
+        elif self._stream.finished:
+            self._stream.start()
+        item = self._stream.read(timeout=None)
+        if item is not None:
+            self.index, self._image = item
+        self._start = time.perf_counter() - self.index / self.fps   # Presentation time of frame 0
+        
+    def _pull(self):
+        """
+        Take the frame of the current presentation time from the stream.
+        
+        When the decoder falls behind, the current frame is kept.
+        
+        :return: None
+        """
+        if self._start is None:
+            self._restart_stream()
+            return
+        target = int((time.perf_counter() - self._start) * self.fps)
+        reads = 0
+        while self.index < target:
+            item = self._stream.read()
+            if item is None:
+                if self._stream.finished:
+                    self.loops += 1
+                    self._restart_stream()
+                    return
+                break
+            self.index, self._image = item
+            reads += 1
+        self._count(reads)
+        
+    def _count(self, frames: int):
+        """
+        Count dropped and repeated frames.
+        
+        :param frames: Number of video frames passed since the last window frame.
+        :return: None
+        """
+        if frames == 0:
+            self.repeated_frames += 1
+        elif frames > 1:
+            self.dropped_frames += frames - 1
+            
+    def seek(self, seconds: Optional[float] = None, frame: Optional[int] = None):
+        """
+        Jump to a time or a frame.
+        
+        When streaming, decoding starts again from the nearest keyframe before it,
+        the keyframe index is built on the first seek and kept in a sidecar file next to the video,
+        see easyplayer.core.widgets.video.clip.KeyframeIndex.
+        
+        Such as, loop a section of a video:
+        
+        >>> if video.time >= 12:
+        >>>     video.seek(8)
+        
+        :param seconds: Time in seconds.
+        :param frame: Frame number, used when seconds is None.
+        :return: None
+        """
+        if seconds is None and frame is None:
+            frame = 0
+        if self._stream is not None:
+            index = self._stream.index
+            if frame is None:
+                frame = index.frame_at(seconds)
+            self._restart_stream(max(0, min(frame, len(index) - 1)))
+            return
+        if frame is None:
+            frame = int(seconds * self.fps)
+        self.index = max(0, min(frame, len(self.images) - 1))
+        self._start = None   # Restart the clock from this frame
+        
+    @property
+    def time(self):
+        """
+        Time of the current frame in seconds.
+        
+        :return: Seconds.
+        """
+        return self.index / self.fps
+    
+    def close(self):
+        """
+        Stop decoding, when streaming.
+        
+        :return: None
+        """
+        if self._stream is not None:
+            self._stream.stop()
+        
     def next(self):
         """
         Play next frame.
         
+        Frames follow their presentation time, this skips a frame.
+        
         :return: None
         """
-        self.index += 1
+        if self._stream is not None:
+            item = self._stream.read(timeout=None)
+            if item is not None:
+                self.index, self._image = item
+                if self._start is not None:
+                    self._start -= 1 / self.fps
+            return
+        self.seek(frame=(self.index + 1) % max(len(self.images), 1))
         
     def update(self):
         """
@@ -73,12 +219,27 @@ class Video(object):
         
         :return: None
         """
-        if 0 <= self.index < len(self.images):
-            image = self.images[self.index]
-            self._screen.blit(image, (self.x, self.y))
+        if self._stream is not None:
+            self._pull()
+            if self._image is not None:
+                self._screen.blit(self._image, (self.x, self.y))
+            return
+        count = len(self.images)
+        if not count:
+            return
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now - self.index / self.fps
         else:
-            self.loops += 1
-            self.index = 0
+            target = int((now - self._start) * self.fps)
+            self._count(target - self.index)
+            if target >= count:
+                loops = target // count
+                self.loops += loops
+                self._start += loops * count / self.fps
+                target %= count
+            self.index = target
+        self._screen.blit(self.images[self.index], (self.x, self.y))
             
     def show(self):
         """
@@ -88,13 +249,13 @@ class Video(object):
         :return: Whether the second time is not played.
         """
         self.update()
-        self.next()
         return self.loops == 0
     
-    def pack(self):
+    def pack(self, layer: int = 0):
         """
         Pack this video object.
 
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._game.add_sprite(self)
+        self._game.add_sprite(self, layer)
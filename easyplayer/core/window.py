@@ -4,24 +4,38 @@ Easy Player window class module.
 
 import sys
 import os
-from typing import Optional, Tuple, Callable, Any
+import time
+import weakref
+from bisect import insort
+from itertools import compress
+from operator import attrgetter, ne
+from typing import Optional, Tuple, Callable, Any, List, Dict
 
 import pygame
 from pygame import constants
 
 from easyplayer.core.event import Event
+from easyplayer.core.input import Input
 from easyplayer.core.saver import queue, SpriteQueue
+from easyplayer.core.cache import image_cache
+from easyplayer.core.dirty import merge_rects
+from easyplayer.utils.spatial import SpatialHash
+from easyplayer.utils.profiler import FrameProfiler
+from easyplayer.utils.replay import EventRecorder, EventReplay
 from easyplayer.core.styles import normal, StyleType
 from easyplayer.exceptions import EasyPlayerHandleError
 
 __all__ = ['Window']
 
+_get_rect = attrgetter('rect')
+
 
 class Window(object):
     def __init__(self, title: Optional[str] = '', size: Optional[Tuple[int, int]] = (640, 480),
                  icon: Optional[str] = None, style: StyleType = normal, fps: int = 60,
                  on_center: bool = False, window_pos: Optional[Tuple[int, int]] = None,
-                 vsync: bool = False, depth: int = 0):
+                 vsync: bool = False, depth: int = 0, dirty_rects: bool = False, culling: bool = True,
+                 headless: bool = False, filter_events: bool = False, coalesce_motion: bool = False):
         """
         Easy Player window object.
         
@@ -34,6 +48,15 @@ class Window(object):
         :param window_pos: Window position.
         :param vsync: Vsync.
         :param depth: Depth.
+        :param dirty_rects: Only redraw and update the rects of widgets that changed since the last frame.
+        When you draw in when_draw callback, call Window.mark_dirty with the rect you drew.
+        A widget is shown once for every changed area it touches, so its show method should only draw.
+        :param culling: Do not show widgets whose rect is outside the screen,
+        unless their always_show attribute is True.
+        :param headless: Render off-screen with SDL dummy drivers and without the mixer,
+        for servers, tests and benchmarks. Create it before any other window.
+        :param filter_events: Let pygame queue only the event types that have handlers (see Window.allow_events).
+        :param coalesce_motion: Merge consecutive mouse motion events of a frame into one, with the sum of their rel.
         """
         if on_center:
             os.environ['SDL_VIDEO_CENTERED'] = '1'
@@ -42,6 +65,10 @@ class Window(object):
             os.environ['SDL_VIDEO_WINDOW_POS'] = f'{x},{y}'
             del x, y
         del on_center, window_pos  # Clear namespace
+        self._headless = headless
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
         self._pg = pygame
         self._init()
         
@@ -56,6 +83,7 @@ class Window(object):
         self.width, self.height = size
         self.screen = self._pg_display.set_mode((self.width, self.height), self._flag, depth=depth, vsync=vsync)
         self._pg_display.set_caption(self._title)
+        image_cache.reconvert()  # Cached images follow the new display format
         
         if icon:
             icon_surface = self._pg_load(icon)
@@ -63,21 +91,45 @@ class Window(object):
             
         self._clock = self._pg.time.Clock()
         self._fps = fps
-        self._sprites = SpriteQueue()  # Create queue
+        self._sprites = SpriteQueue(self._packed, self._unpacked)  # Create queue
+        self._frame = 0
+        self._step = 0.0
+        self._alpha = 0.0
+        
+        self._dirty_rects = dirty_rects
+        self._dirty_marked = [self.screen.get_rect()]  # Draw the whole screen in the first frame
+        self._dirty_drawn = set()
+        
+        self._culling = culling
+        self._drawn_count = 0
+        self._culled_count = 0
+        
+        self._clickables = weakref.WeakSet()  # Widgets with a click callback, packed or not
+        self._clickable = SpatialHash()  # The packed ones
+        self._click_rects: Dict[Any, pygame.Rect] = {}  # Rects they were indexed with
+        self._profiler: Optional[FrameProfiler] = None
+        self._recorder: Optional[EventRecorder] = None
+        self._replay: Optional[EventReplay] = None
         
         self._event = Event()
+        self._input = Input()
         
         # Define default callbacks
         _empty_func = lambda: None
-        self._when_mouse_down = _empty_func
-        self._when_mouse_up = _empty_func
-        self._when_key_down = _empty_func
-        self._when_key_up = _empty_func
-        self._when_mouse_move = _empty_func
         self._when_draw = _empty_func
+        self._when_update = _empty_func
         self._when_close = self.destroy
-        self._when_resize = _empty_func
-        self._when_active = _empty_func
+        
+        # Event type -> handlers, highest priority first
+        self._handler_entries: Dict[int, List[Tuple[int, int, Callable[[], Any]]]] = {}
+        self._handlers: Dict[int, List[Callable[[], Any]]] = {}
+        self._handler_count = 0
+        self._filter_events = filter_events
+        self._allowed_events = {constants.QUIT, constants.VIDEORESIZE}
+        self._coalesce_motion = coalesce_motion
+        self._events_received = 0
+        self._events_dispatched = 0
+        self.add_handler(constants.MOUSEBUTTONDOWN, self._hit_test, priority=-100)
         
         queue.append(self)
         
@@ -90,8 +142,11 @@ class Window(object):
         
         :return: None
         """
-        self._pg.init()
-        self._pg.mixer.init()
+        if self._headless:   # No audio device, only init display
+            self._pg.display.init()
+        else:
+            self._pg.init()
+            self._pg.mixer.init()
         self._pg.font.init()
         
     def destroy(self, status: int = 0):
@@ -101,6 +156,7 @@ class Window(object):
         :param status: Exit status.
         :return: None
         """
+        self.stop_recording()
         self._pg.quit()
         self._pg.mixer.quit()
         sys.exit(status)
@@ -113,50 +169,231 @@ class Window(object):
         """
         self._pg_display.update()
         
+    def mark_dirty(self, rect: Optional[pygame.Rect] = None):
+        """
+        Redraw and update a rect in the next frame of the dirty rectangle render mode.
+        
+        :param rect: The rect, the whole screen if it is None.
+        :return: None
+        """
+        if self._dirty_rects:
+            self._dirty_marked.append(self.screen.get_rect() if rect is None else pygame.Rect(rect))
+        
+    def _collect_dirty(self):
+        """
+        Collect the rects that widgets touched or uncovered since the last frame.
+        
+        Widgets without dirty_rects method are redrawn with the whole screen.
+        
+        :return: A list of rects.
+        """
+        rects: List[pygame.Rect] = self._dirty_marked
+        self._dirty_marked = []
+        screen_rect = self.screen.get_rect()
+        drawn = set()
+        for sprite in self._sprites:
+            drawn.add(sprite)
+            if hasattr(sprite, 'dirty_rects'):
+                rects.extend(sprite.dirty_rects())
+            else:
+                rects.append(screen_rect)
+        for sprite in self._dirty_drawn - drawn:   # Removed widgets uncover their last rects
+            if hasattr(sprite, 'dirty_tracker'):
+                rects.extend(sprite.dirty_tracker.forget())
+            else:
+                rects.append(screen_rect)
+        self._dirty_drawn = drawn
+        return [rect.clip(screen_rect) for rect in rects if rect.colliderect(screen_rect)]
+    
+    def _draw_dirty(self):
+        """
+        Draw packed sprites in dirty rectangle render mode.
+        
+        Overlapping changed rects are merged, then every rect is filled
+        and only the sprites that touch it are drawn again, clipped to it.
+        Sprites that touch no changed rect are still shown once with an empty clip, so that their callbacks work.
+        
+        :return: The rects to update.
+        """
+        rects = merge_rects(self._collect_dirty())
+        screen = self.screen
+        for rect in rects:
+            screen.set_clip(rect)
+            screen.fill((255, 255, 255))
+        if self._profiler is not None:
+            self._profiler.mark('fill')
+        self._draw_sprites(rects)
+        screen.set_clip(None)
+        return rects
+    
+    def _show_clipped(self, sprite, rects: List[pygame.Rect]):
+        """
+        Show a sprite in the rects it touches.
+        
+        :param sprite: The sprite.
+        :param rects: Rects that do not overlap.
+        :return: None
+        """
+        rect = getattr(sprite, 'rect', None)
+        if rect is not None:
+            rects = [r for r in rects if r.colliderect(rect)]
+        screen = self.screen
+        if not rects:
+            screen.set_clip(pygame.Rect(0, 0, 0, 0))
+            sprite.show()
+            return
+        for r in rects:
+            screen.set_clip(r)
+            sprite.show()
+    
+    def _draw_sprites(self, rects: Optional[List[pygame.Rect]] = None):
+        """
+        Show packed sprites, skipping the ones outside the screen.
+        
+        :param rects: Only draw in these rects, see Window._draw_dirty. Draw on the whole screen if it is None.
+        :return: None
+        """
+        drawn = culled = 0
+        profiler = self._profiler
+        if self._culling:
+            viewport = self.screen.get_rect()
+            collide = viewport.colliderect
+        for sprite in self._sprites:
+            if self._culling:
+                rect = getattr(sprite, 'rect', None)
+                if rect is not None and not collide(rect) and not getattr(sprite, 'always_show', False):
+                    culled += 1
+                    continue
+            if profiler is not None:
+                start = time.perf_counter()
+            if rects is None:
+                sprite.show()
+            else:
+                self._show_clipped(sprite, rects)
+            if profiler is not None:
+                profiler.widget(sprite, time.perf_counter() - start)
+            drawn += 1
+        self._drawn_count, self._culled_count = drawn, culled
+        if profiler is not None:
+            profiler.mark('widgets')
+        
+    def add_clickable(self, widget):
+        """
+        Hit-test a widget when the mouse is pressed.
+        
+        When_click_me decorators of widgets call it, the topmost packed widget under the mouse is clicked.
+        The window keeps a weak reference, and indexes the widget only while it is packed.
+        
+        :param widget: A widget with rect attribute and click method.
+        :return: None
+        """
+        self._clickables.add(widget)
+        if widget in self._sprites:
+            self._packed(widget)
+            
+    def _packed(self, sprite):
+        """
+        Index a sprite put in the sprite queue, if it is clickable.
+        
+        :param sprite: The sprite.
+        :return: None
+        """
+        if sprite in self._clickables:
+            self._clickable.add(sprite)
+            self._click_rects[sprite] = sprite.rect.copy()
+            
+    def _unpacked(self, sprite):
+        """
+        Forget a sprite taken out of the sprite queue.
+        
+        :param sprite: The sprite.
+        :return: None
+        """
+        self._clickable.remove(sprite)
+        self._click_rects.pop(sprite, None)
+        
+    def _hit_test(self):
+        """
+        Click the topmost packed widget under the mouse.
+        
+        It is the mouse down handler with the lowest priority,
+        so frames without mouse down events pay nothing.
+        Only widgets whose rect changed since the last click are moved in the index.
+        
+        :return: None
+        """
+        index = self._clickable
+        if not len(index):
+            return
+        rects = self._click_rects
+        widgets = list(rects)
+        for widget in compress(widgets, map(ne, map(_get_rect, widgets), map(rects.get, widgets))):
+            index.update(widget)
+            rects[widget] = widget.rect.copy()
+        x, y = self._event['pos']
+        widget = self._sprites.top(index.query_rect((x, y, 1, 1)))
+        if widget is not None:
+            widget.click()
+        
     def when_mouse_down(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when mouse down.
+        
+        Every decorated function is called, in the order they were decorated.
 
         :param func: Callback function.
-        :return: None
+        :return: The callback function.
         """
-        self._when_mouse_down = func
-
+        self.add_handler(constants.MOUSEBUTTONDOWN, func)
+        return func
+        
     def when_mouse_up(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when mouse up.
+        
+        Every decorated function is called, in the order they were decorated.
 
         :param func: Callback function.
-        :return: None
+        :return: The callback function.
         """
-        self._when_mouse_up = func
+        self.add_handler(constants.MOUSEBUTTONUP, func)
+        return func
         
     def when_mouse_move(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when mouse is moving.
+        
+        Every decorated function is called, in the order they were decorated.
 
         :param func: Callback function.
-        :return: None
+        :return: The callback function.
         """
-        self._when_mouse_move = func
+        self.add_handler(constants.MOUSEMOTION, func)
+        return func
         
     def when_key_down(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when key down.
+        
+        Every decorated function is called, in the order they were decorated.
 
         :param func: Callback function.
-        :return: None
+        :return: The callback function.
         """
-        self._when_key_down = func
+        self.add_handler(constants.KEYDOWN, func)
+        return func
         
     def when_key_up(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when key up.
+        
+        Every decorated function is called, in the order they were decorated.
 
         :param func: Callback function.
-        :return: None
+        :return: The callback function.
         """
-        self._when_key_up = func
+        self.add_handler(constants.KEYUP, func)
+        return func
         
     def when_draw(self, func: Callable[[], Any]):
         """
@@ -167,6 +404,17 @@ class Window(object):
         """
         self._when_draw = func
         
+    def when_update(self, func: Callable[[], Any]):
+        """
+        A decorator to decorate a callback function when update game logic.
+        
+        It is called at a fixed rate by Window.show_fixed, see Window.step and Window.alpha.
+
+        :param func: Callback function.
+        :return: None
+        """
+        self._when_update = func
+        
     def when_close(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when close window.
@@ -181,45 +429,190 @@ class Window(object):
     def when_resize(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when resize window.
+        
+        Every decorated function is called, in the order they were decorated.
 
         :param func: Callback function.
-        :return: None
+        :return: The callback function.
         """
-        self._when_resize = func
+        self.add_handler(constants.VIDEORESIZE, func)
+        return func
         
     def when_active(self, func: Callable[[], Any]):
         """
         A decorator to decorate a callback function when active window.
+        
+        Every decorated function is called, in the order they were decorated.
 
         :param func: Callback function.
+        :return: The callback function.
+        """
+        self.add_handler(constants.ACTIVEEVENT, func)
+        return func
+        
+    def add_handler(self, event_type: int, func: Callable[[], Any], priority: int = 0):
+        """
+        Add a callback function of a pygame event type.
+        
+        Handlers with higher priority are called first, handlers with the same priority in the order they were added.
+        A handler can call Window.event.stop_propagation() to skip the rest.
+        
+        :param event_type: Pygame event type, such as pygame.KEYDOWN.
+        :param func: Callback function.
+        :param priority: Priority.
         :return: None
         """
-        self._when_active = func
+        self._handler_count += 1
+        entries = self._handler_entries.setdefault(event_type, [])
+        insort(entries, (-priority, self._handler_count, func))
+        self._handlers[event_type] = [entry[2] for entry in entries]   # A new list, safe to change while dispatching
+        self._update_event_filter()
+        
+    def remove_handler(self, event_type: int, func: Callable[[], Any]):
+        """
+        Remove a callback function of a pygame event type.
+        
+        :param event_type: Pygame event type.
+        :param func: Callback function.
+        :return: None
+        """
+        entries = [entry for entry in self._handler_entries.get(event_type, []) if entry[2] != func]
+        self._handler_entries[event_type] = entries
+        self._handlers[event_type] = [entry[2] for entry in entries]
+        self._update_event_filter()
+        
+    def allow_events(self, *event_types: int):
+        """
+        Let pygame queue event types without handlers when filter_events is on.
+        
+        Widgets that read Window.event in their show method call it.
+        
+        :param event_types: Pygame event types.
+        :return: None
+        """
+        self._allowed_events.update(event_types)
+        self._update_event_filter()
+        
+    def _update_event_filter(self):
+        """
+        Block the event types that nothing handles, when filter_events is on.
+        
+        :return: None
+        """
+        if not self._filter_events:
+            return
+        allowed = self._allowed_events.union(t for t, handlers in self._handlers.items() if handlers)
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(allowed))
         
     def _event_handler(self, event: pygame.event.Event):
         """
         Parser and do event.
         
+        The window event object is reused for every event.
+        
         :param event: Pygame event.
         :return: None
         """
-        self._event = Event(event)
-        if self._event.mouse_down:
-            self._when_mouse_down()
-        elif self._event.mouse_up:
-            self._when_mouse_up()
-        elif self._event.key_up:
-            self._when_key_up()
-        elif self._event.key_down:
-            self._when_key_down()
-        elif self._event.mouse_moving:
-            self._when_mouse_move()
-        elif self._event.resizing:
-            self._when_resize()
-        elif self._event.active:
-            self._when_active()
-        
-    def show(self, escape_quit: bool = False):
+        self._event.bind(event)
+        handlers = self._handlers.get(event.type)
+        if handlers:
+            stopped = self._event.stopped
+            for func in handlers:
+                func()
+                if stopped():
+                    break
+        
+    def _draw(self):
+        """
+        Draw packed sprites and call when_draw callback.
+        
+        :return: The rects to update, None to update the whole screen.
+        """
+        profiler = self._profiler
+        if self._dirty_rects:
+            rects = self._draw_dirty()
+        else:
+            rects = None
+            self.screen.fill((255, 255, 255))   # White style
+            if profiler is not None:
+                profiler.mark('fill')
+            self._draw_sprites()   # Draw packed sprites
+        self._when_draw()
+        if profiler is not None:
+            profiler.mark('draw')
+            if profiler.overlay:
+                self.mark_dirty(profiler.draw(self.screen))
+        return rects
+    
+    def _handle_events(self, escape_quit: bool = False):
+        """
+        Get and do all events in the queue.
+        
+        :param escape_quit: Press Escape to exit.
+        :return: None
+        """
+        events = pygame.event.get()
+        if self._replay is not None:
+            if any(event.type == constants.QUIT for event in events):   # The real window is closed
+                self._when_close()
+            events = self._replay.next_frame()
+        if self._recorder is not None:
+            self._recorder.write(self._frame, events)
+        self._events_received = len(events)
+        if self._coalesce_motion and len(events) > 1:
+            events = self._coalesce(events)
+        self._events_dispatched = len(events)
+        for event in events:
+            if event.type == constants.QUIT:
+                self._when_close()
+            if escape_quit and event.type == constants.KEYDOWN:
+                if event.key == constants.K_ESCAPE:
+                    self._when_close()
+            if event.type == constants.VIDEORESIZE:
+                self.mark_dirty()
+            self._event_handler(event)
+        if self._profiler is not None:
+            self._profiler.mark('events')
+            
+    @staticmethod
+    def _coalesce(events: List[pygame.event.Event]):
+        """
+        Merge consecutive mouse motion events.
+        
+        The merged event has the position and buttons of the last event, and the sum of rel.
+        
+        :param events: Pygame events.
+        :return: A list of pygame events.
+        """
+        res = []
+        for event in events:
+            if event.type == constants.MOUSEMOTION and res and res[-1].type == constants.MOUSEMOTION:
+                (x, y), (dx, dy) = res[-1].rel, event.rel
+                attrs = event.dict.copy()
+                attrs['rel'] = (x + dx, y + dy)
+                res[-1] = pygame.event.Event(constants.MOUSEMOTION, attrs)
+            else:
+                res.append(event)
+        return res
+        
+    def _present(self, rects: Optional[List[pygame.Rect]] = None):
+        """
+        Update the screen and count the frame.
+        
+        :param rects: The rects to update, None to update the whole screen.
+        :return: None
+        """
+        if rects is None:
+            self.update()
+        else:
+            self._pg_display.update(rects + self._dirty_marked)  # Marked rects are redrawn next frame
+        self._frame += 1
+        if self._profiler is not None:
+            self._profiler.mark('display')
+            self._profiler.end_frame()
+        
+    def show(self, escape_quit: bool = False, frames: Optional[int] = None):
         """
         Show and update this window.
         Start main loop.
@@ -231,25 +624,26 @@ class Window(object):
         >>> if __name__ == '__main__':
         >>>    window.show()
         
+        Run 600 frames as fast as possible without a display:
+        
+        >>> window = ep.Window(headless=True, fps=0)
+        >>> window.show(frames=600)
+        
         :param escape_quit: Press Escape to exit.
+        :param frames: Return after this number of frames, run forever if it is None.
         :return: None
         """
-        while True:
-            self._clock.tick(self._fps)
-            self.screen.fill((255, 255, 255))   # White style
-            for sprite in self._sprites:   # Draw packed sprites
-                sprite.show()
-            self._when_draw()
-            
-            for event in pygame.event.get():
-                if event.type == constants.QUIT:
-                    self._when_close()
-                if escape_quit and event.type == constants.KEYDOWN:
-                    if event.key == constants.K_ESCAPE:
-                        self._when_close()
-                self._event_handler(event)
-              
-            self.update()
+        if escape_quit:
+            self.allow_events(constants.KEYDOWN)
+        end = None if frames is None else self._frame + frames
+        while end is None or self._frame < end:
+            self._clock.tick(self._fps)   # FPS 0 is unthrottled
+            if self._profiler is not None:
+                self._profiler.begin_frame()
+            rects = self._draw()
+            self._handle_events(escape_quit)
+            self._update_input()
+            self._present(rects)
             
     @property
     def event(self):
@@ -260,6 +654,233 @@ class Window(object):
         """
         return self._event
     
+    @property
+    def input(self):
+        """
+        Keyboard and mouse state, taken once per frame by Window.show and once per update by Window.show_fixed.
+        
+        :return: Window input state.
+        """
+        return self._input
+    
+    def show_fixed(self, rate: int = 60, escape_quit: bool = False,
+                   frames: Optional[int] = None, max_steps: int = 5):
+        """
+        Show and update this window with a fixed timestep.
+        Start main loop.
+        
+        The when_update callback runs rate times per second of real time, however fast the window draws,
+        so game logic stays deterministic when drawing slows down.
+        Drawing runs at the FPS of this window, use Window.alpha to interpolate between two updates.
+        
+        Like this:
+        
+        >>> import easyplayer as ep
+        >>> window = ep.Window(fps=0)
+        >>> @window.when_update
+        >>> def update():
+        >>>     sprite.forward(120 * window.step)   # 120 pixels per second
+        >>> window.show_fixed(rate=50)
+        
+        :param rate: Updates per second.
+        :param escape_quit: Press Escape to exit.
+        :param frames: Return after this number of frames, run forever if it is None.
+        :param max_steps: Most updates in one frame. When logic falls further behind, the rest is dropped,
+        so that slow updates do not make the next frame even slower.
+        :return: None
+        """
+        if escape_quit:
+            self.allow_events(constants.KEYDOWN)
+        self._step = step = 1 / rate
+        accumulator = 0.0
+        last = time.perf_counter()
+        end = None if frames is None else self._frame + frames
+        while end is None or self._frame < end:
+            self._clock.tick(self._fps)
+            now = time.perf_counter()
+            accumulator += now - last
+            last = now
+            if self._profiler is not None:
+                self._profiler.begin_frame()
+            
+            self._handle_events(escape_quit)
+            steps = 0
+            while accumulator >= step and steps < max_steps:
+                self._update_input()   # Once per update, so just_pressed holds for one update
+                self._when_update()
+                accumulator -= step
+                steps += 1
+            if self._profiler is not None:
+                self._profiler.mark('logic')
+            if accumulator >= step:   # Too far behind, avoid the spiral of death
+                accumulator %= step
+            self._alpha = accumulator / step
+            
+            rects = self._draw()
+            self._present(rects)
+            
+    def _update_input(self):
+        """
+        Take a snapshot of the keyboard and mouse, from the replayed events when replaying.
+        
+        :return: None
+        """
+        if self._replay is None:
+            self._input.update()
+        else:
+            self._input.update(*self._replay.state())
+    
+    def start_recording(self, path: str):
+        """
+        Save the events handled from the next frame on, with their frame numbers, see Window.replay.
+        
+        :param path: Log path.
+        :return: The recorder.
+        """
+        self.stop_recording()
+        self._recorder = EventRecorder(path)
+        return self._recorder
+    
+    def stop_recording(self):
+        """
+        Stop saving events and close the log. It is called when the window is destroyed.
+        
+        :return: The recorder, None if it was not recording.
+        """
+        recorder, self._recorder = self._recorder, None
+        if recorder is not None:
+            recorder.close()
+        return recorder
+    
+    def replay(self, path: str, fast: bool = True, escape_quit: bool = False):
+        """
+        Run the main loop with the events of a log saved by Window.start_recording, frame by frame,
+        instead of the events of the real keyboard and mouse.
+        
+        The same log gives the same frames every time, so replays are also load benchmarks:
+        
+        >>> window = ep.Window(headless=True)
+        >>> profiler = window.enable_profiler()
+        >>> window.replay('play.epev')
+        >>> print(profiler.report())
+        
+        Only Window.show is replayed exactly, the number of updates per frame of Window.show_fixed follows the real time.
+        
+        :param path: Log path.
+        :param fast: Run as fast as possible instead of at the FPS of this window.
+        :param escape_quit: Press Escape to exit, recorded Escape presses count too.
+        :return: Number of frames replayed.
+        """
+        replay = EventReplay(path)
+        fps = self._fps
+        self._replay = replay
+        if fast:
+            self._fps = 0
+        try:
+            self.show(escape_quit, frames=replay.length)
+        finally:
+            self._replay = None
+            self._fps = fps
+        return replay.length
+    
+    def enable_profiler(self, size: int = 600, overlay: bool = False):
+        """
+        Start recording frame times, see easyplayer.utils.profiler.FrameProfiler.
+        
+        :param size: Number of frames kept.
+        :param overlay: Draw frame times on the top left of the screen.
+        :return: The profiler.
+        """
+        self._profiler = FrameProfiler(size, overlay)
+        return self._profiler
+    
+    def disable_profiler(self):
+        """
+        Stop recording frame times.
+        
+        :return: The profiler, None if it was not enabled.
+        """
+        profiler, self._profiler = self._profiler, None
+        return profiler
+    
+    @property
+    def profiler(self):
+        """
+        The frame profiler, None if it is not enabled.
+        
+        :return: The profiler.
+        """
+        return self._profiler
+    
+    @property
+    def step(self):
+        """
+        Seconds of game time per update of Window.show_fixed.
+        
+        :return: Seconds.
+        """
+        return self._step
+    
+    @property
+    def alpha(self):
+        """
+        How far the current frame is between the last update and the next one, from 0 to 1.
+        
+        Draw at previous + (current - previous) * alpha for smooth movement.
+        
+        :return: Interpolation alpha.
+        """
+        return self._alpha
+    
+    @property
+    def frame(self):
+        """
+        Number of frames shown.
+        
+        :return: Number of frames.
+        """
+        return self._frame
+    
+    @property
+    def headless(self):
+        return self._headless
+    
+    @property
+    def events_received(self):
+        """
+        Number of events got from pygame in the last frame.
+        
+        :return: Number of events.
+        """
+        return self._events_received
+    
+    @property
+    def events_dispatched(self):
+        """
+        Number of events handled in the last frame, after merging mouse motion events.
+        
+        :return: Number of events.
+        """
+        return self._events_dispatched
+    
+    @property
+    def drawn_count(self):
+        """
+        Number of widgets shown in the last frame.
+        
+        :return: Number of widgets.
+        """
+        return self._drawn_count
+    
+    @property
+    def culled_count(self):
+        """
+        Number of widgets skipped in the last frame because they were outside the screen.
+        
+        :return: Number of widgets.
+        """
+        return self._culled_count
+    
     @property
     def mouse(self):
         """
@@ -323,16 +944,17 @@ class Window(object):
         """
         self._fps = fps
         
-    def add_sprite(self, sprite):
+    def add_sprite(self, sprite, layer: int = 0):
         """
         Add a sprite.
         
         With Sprite.pack() has the same effect.
         
         :param sprite: Sprite.
+        :param layer: Z-layer, higher layers are drawn above lower layers.
         :return: None
         """
-        self._sprites.append(sprite)
+        self._sprites.append(sprite, layer)
         
     def clear(self):
         """
@@ -341,6 +963,7 @@ class Window(object):
         :return: None
         """
         self.screen.fill((255, 255, 255))
+        self.mark_dirty()
     
     
 class _Mouse(object):
@@ -55,4 +55,20 @@ class EasyPlayerTranslateError(EasyPlayerError):
 
 
 class EasyPlayerChatterError(EasyPlayerError):
-    pass
\ No newline at end of file
+    pass
+
+
+class EasyPlayerCollideError(EasyPlayerError):
+    pass
+
+
+class EasyPlayerInputError(EasyPlayerError):
+    pass
+
+
+class EasyPlayerReplayError(EasyPlayerError):
+    pass
+
+
+class EasyPlayerVideoError(EasyPlayerWidgetsError):
+    pass
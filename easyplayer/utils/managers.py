@@ -3,15 +3,22 @@ Easy Player managers tools module.
 """
 
 import copy
+from itertools import compress
+from operator import attrgetter, ne
 from typing import Any, Tuple, List
 
-from pygame.sprite import Group, Sprite, groupcollide, spritecollide
+from pygame import Rect
+from pygame.sprite import Group, Sprite, spritecollide
 
 from easyplayer.core.saver import queue
+from easyplayer.core.collide import get_collide
+from easyplayer.utils.spatial import SpatialHash
 from easyplayer.exceptions import EasyPlayerSaverError, EasyPlayerOnlyReadError
 
 __all__ = ['VariableManager', 'CloneManager']
 
+_get_rect = attrgetter('rect')
+
 
 class VariableManager(object):
     def __init__(self, **var):
@@ -97,17 +104,34 @@ class VariableManager(object):
     
     
 class CloneManager(object):
-    def __init__(self, *sprites: Tuple[Sprite]):
+    def __init__(self, *sprites: Tuple[Sprite], cell_size: int = 64, collide_mode: str = 'rect'):
         """
         Easy Player clone manager.
         
+        Collisions are found through a spatial hash (see easyplayer.utils.spatial.SpatialHash),
+        so only sprites in nearby cells are tested.
+        Every collision query first re-bins the clones whose rect changed since the last query,
+        so results are the same as pygame.sprite.spritecollide however the clones move.
+        That check reads every rect, so single rect mode queries of collide_sprites test the rects directly,
+        the hash pays off in collide_clones and in the circle and mask modes.
+        
         :param sprites: Clones.
+        :param cell_size: Cell size of the spatial hash, about the size of a clone works well.
+        :param collide_mode: Collide mode, 'rect', 'circle' or 'mask', see easyplayer.core.collide.
+        Circle and mask are only tested on sprites whose rects collide.
+        :raise: EasyPlayerCollideError
         """
         if not queue:
             raise EasyPlayerSaverError('please create a game first')
         self._game = queue[-1]
         self._screen = self._game.screen
         self._sprites = Group(*sprites)
+        self._cell_size = cell_size
+        self._index = SpatialHash(cell_size)
+        self._synced: List[Sprite] = []   # Sprites in the spatial hash
+        self._synced_rects: List[Rect] = []   # Copies of the rects they were indexed with, in the same order
+        self._collide_mode = collide_mode
+        self._collide = get_collide(collide_mode)
         
     def __copy__(self):
         """
@@ -115,7 +139,7 @@ class CloneManager(object):
         
         :return: The same clone manager.
         """
-        return CloneManager(*self._sprites.sprites())
+        return CloneManager(*self._sprites.sprites(), cell_size=self._cell_size, collide_mode=self._collide_mode)
     
     copy = __copy__
     
@@ -144,6 +168,7 @@ class CloneManager(object):
         :return: None
         """
         self._sprites.remove(sprite)
+        self._index.remove(sprite)
         
     def has(self, *sprites: List[Sprite]):
         """
@@ -170,11 +195,75 @@ class CloneManager(object):
         :return: None
         """
         self._sprites.empty()
+        self._index.clear()
+        self._synced, self._synced_rects = [], []
     
     @property
     def group(self):
         return self._sprites
     
+    @property
+    def collide_mode(self):
+        return self._collide_mode
+    
+    @collide_mode.setter
+    def collide_mode(self, set_mode: str):
+        self._collide = get_collide(set_mode)
+        self._collide_mode = set_mode
+    
+    @property
+    def index(self):
+        """
+        The spatial hash of the sprites in this manager, updated to where they are now.
+        
+        :return: The spatial hash.
+        """
+        self.sync()
+        return self._index
+    
+    def _query(self, manager, sprite: Sprite):
+        """
+        Find sprites of a manager that collide with a sprite in the collide mode of this manager.
+        
+        The manager must be synced.
+        
+        :param manager: This manager or another one.
+        :param sprite: The sprite.
+        :return: A list of sprites.
+        """
+        collision = manager._index.query_rect(sprite.rect)
+        if self._collide_mode != 'rect':
+            collide = self._collide
+            collision = [other for other in collision if collide(sprite, other)]
+        return collision
+    
+    def sync(self):
+        """
+        Update the spatial hash with the sprites in this manager.
+        
+        Collision queries call it first. Rects are compared with the ones the sprites were indexed with,
+        only sprites whose rect changed are re-binned, and killed sprites are removed.
+        When nothing changed, it costs two list comparisons.
+        
+        :return: None
+        """
+        index, alive = self._index, self._sprites.spritedict
+        sprites = list(alive)
+        rects = list(map(_get_rect, sprites))
+        if sprites == self._synced:
+            cached = self._synced_rects
+            if rects == cached:
+                return
+        else:   # Sprites were added or killed
+            for sprite in [sprite for sprite in index if sprite not in alive]:
+                index.remove(sprite)
+            old = dict(zip(self._synced, self._synced_rects))
+            cached = [old.get(sprite) if sprite in index else None for sprite in sprites]
+            self._synced, self._synced_rects = sprites, cached
+        for i in compress(range(len(rects)), map(ne, rects, cached)):
+            index.update(sprites[i])
+            cached[i] = rects[i].copy()
+    
     def collide_clones(self, other, kill_self: bool = False, kill_other: bool = False):
         """
         Find sprites that collide with another manager in this manager.
@@ -184,7 +273,22 @@ class CloneManager(object):
         :param kill_other: Delete the collision sprite in other manager.
         :return: A dictionary of all sprites in this manager that collide.
         """
-        return groupcollide(self._sprites, other.group, kill_self, kill_other)
+        self.sync()
+        other.sync()
+        res = {}
+        for sprite in self._sprites.sprites():
+            collision = self._query(other, sprite)
+            if not collision:
+                continue
+            if kill_other:
+                for other_sprite in collision:
+                    other_sprite.kill()
+                    other._index.remove(other_sprite)
+            if kill_self:
+                sprite.kill()
+                self._index.remove(sprite)
+            res[sprite] = collision
+        return res
     
     def collide_sprites(self, sprite: Sprite, kill_it: bool = False):
         """
@@ -194,7 +298,15 @@ class CloneManager(object):
         :param kill_it: Delete other sprite.
         :return: A list containing all Sprites in a manager that intersect with another sprite.
         """
-        return spritecollide(sprite, self._sprites, kill_it)
+        if self._collide_mode == 'rect':   # A sync reads every rect too, so test them directly
+            return spritecollide(sprite, self._sprites, kill_it)
+        self.sync()
+        collision = self._query(self, sprite)
+        if kill_it:
+            for clone in collision:
+                clone.kill()
+                self._index.remove(clone)
+        return collision
     
     def collide_other(self, other, kill_self: bool = False, kill_other: bool = False):
         """
@@ -0,0 +1,236 @@
+"""
+Easy Player frame profiler.
+
+Such as:
+
+>>> import easyplayer as ep
+>>> window = ep.Window()
+>>> profiler = window.enable_profiler(overlay=True)
+>>> window.show(frames=600)
+>>> print(profiler.report())
+>>> profiler.to_csv('frames.csv')
+"""
+
+import csv
+import json
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import pygame
+
+from easyplayer.core.text import font_registry
+
+__all__ = ['FrameProfiler']
+
+PHASES = ('logic', 'fill', 'widgets', 'draw', 'events', 'display')
+
+
+def _widget_key(widget: Any):
+    """
+    Get the name a widget is recorded under.
+
+    :param widget: The widget.
+    :return: Its profile_name attribute if it is set, else its class name and id, such as 'Sprite#7f3a2c1d0e50'.
+    """
+    return getattr(widget, 'profile_name', None) or f'{type(widget).__name__}#{id(widget):x}'
+
+
+class FrameProfiler(object):
+    def __init__(self, size: int = 600, overlay: bool = False):
+        """
+        Easy Player frame profiler.
+
+        Records the time of every phase of the main loop and of every widget,
+        for the last size frames.
+        Widgets are recorded by name, not kept alive, set a profile_name attribute on a widget to name it.
+
+        Phases:
+        logic: when_update callbacks of Window.show_fixed.
+        fill: clear the screen.
+        widgets: show packed widgets.
+        draw: when_draw callback.
+        events: get and do events.
+        display: update the display.
+
+        :param size: Number of frames kept.
+        :param overlay: Draw frame times on the top left of the screen.
+        """
+        self._frames = deque(maxlen=size)
+        self._current: Optional[Dict[str, Any]] = None
+        self._last = 0.0
+        self._start = 0.0
+        self.overlay = overlay
+        self._font = None
+        self._text = None
+        self._overlay_frames = 0
+
+    def __str__(self):
+        return f'FrameProfiler(frames={len(self)})'
+
+    def __len__(self):
+        return len(self._frames)
+
+    def begin_frame(self):
+        """
+        Start recording a frame.
+
+        :return: None
+        """
+        self._start = self._last = time.perf_counter()
+        self._current = {'widgets_list': []}
+
+    def mark(self, phase: str):
+        """
+        Record the time since the last mark as a phase.
+
+        :param phase: Phase name.
+        :return: None
+        """
+        if self._current is None:
+            return
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def widget(self, widget: Any, seconds: float):
+        """
+        Record the time a widget took to show.
+
+        :param widget: The widget, only its name is kept.
+        :param seconds: Seconds.
+        :return: None
+        """
+        if self._current is not None:
+            self._current['widgets_list'].append((_widget_key(widget), seconds))
+
+    def end_frame(self):
+        """
+        Finish recording a frame.
+
+        :return: None
+        """
+        if self._current is None:
+            return
+        self._current['frame'] = time.perf_counter() - self._start
+        self._frames.append(self._current)
+        self._current = None
+
+    def clear(self):
+        """
+        Forget all recorded frames.
+
+        :return: None
+        """
+        self._frames.clear()
+
+    @property
+    def frame_times(self):
+        """
+        Frame times of the recorded frames, without waiting for the FPS limit.
+
+        :return: A list of seconds.
+        """
+        return [frame['frame'] for frame in self._frames]
+
+    def percentile(self, percent: float):
+        """
+        Get a percentile of the frame times.
+
+        :param percent: Percent, such as 50, 95, 99.
+        :return: Seconds, 0.0 when no frame is recorded.
+        """
+        times = sorted(self.frame_times)
+        if not times:
+            return 0.0
+        index = min(len(times) - 1, max(0, int(round(percent / 100 * len(times))) - 1))
+        return times[index]
+
+    def phase_means(self):
+        """
+        Get the mean time of every phase.
+
+        :return: A dictionary of phase name to seconds.
+        """
+        count = len(self._frames) or 1
+        return {phase: sum(frame.get(phase, 0.0) for frame in self._frames) / count for phase in PHASES}
+
+    def slowest_widgets(self, number: int = 10):
+        """
+        Get the widgets with the highest mean show time.
+
+        :param number: Number of widgets.
+        :return: A list of (widget name, mean seconds, max seconds, frames).
+        """
+        stats = {}
+        for frame in self._frames:
+            for name, seconds in frame['widgets_list']:
+                total, most, count = stats.get(name, (0.0, 0.0, 0))
+                stats[name] = total + seconds, max(most, seconds), count + 1
+        res = [(name, total / count, most, count) for name, (total, most, count) in stats.items()]
+        res.sort(key=lambda item: item[1], reverse=True)
+        return res[:number]
+
+    def report(self):
+        """
+        Summarize the recorded frames.
+
+        :return: A dictionary of frame count, frame time percentiles, phase means and slowest widgets, in seconds.
+        """
+        times = self.frame_times
+        return {
+            'frames': len(times),
+            'mean': sum(times) / len(times) if times else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': max(times) if times else 0.0,
+            'phases': self.phase_means(),
+            'slowest_widgets': self.slowest_widgets(),
+        }
+
+    def to_json(self, save_path: str = 'profile.json'):
+        """
+        Save the report and the recorded frames as JSON.
+
+        :param save_path: Save path.
+        :return: Save path.
+        """
+        data = self.report()
+        data['frame_list'] = [{phase: frame.get(phase, 0.0) for phase in ('frame',) + PHASES}
+                              for frame in self._frames]
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return save_path
+
+    def to_csv(self, save_path: str = 'profile.csv'):
+        """
+        Save the recorded frames as CSV, one row per frame, in seconds.
+
+        :param save_path: Save path.
+        :return: Save path.
+        """
+        with open(save_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('index', 'frame') + PHASES)
+            for index, frame in enumerate(self._frames):
+                writer.writerow([index, frame['frame']] + [frame.get(phase, 0.0) for phase in PHASES])
+        return save_path
+
+    def draw(self, surface: pygame.Surface):
+        """
+        Draw frame times on the top left of a surface.
+
+        The text is rendered again every 30 frames.
+
+        :param surface: The surface.
+        :return: The rect drawn.
+        """
+        self._overlay_frames += 1
+        if self._text is None or self._overlay_frames % 30 == 0:
+            if self._font is None:
+                self._font = font_registry.get(None, 20)
+            text = (f'p50 {self.percentile(50) * 1000:.1f}ms  p95 {self.percentile(95) * 1000:.1f}ms  '
+                    f'p99 {self.percentile(99) * 1000:.1f}ms')
+            self._text = self._font.render(text, True, (255, 255, 0), (0, 0, 0))
+        return surface.blit(self._text, (0, 0))
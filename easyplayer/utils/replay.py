@@ -0,0 +1,214 @@
+"""
+Easy Player input recording and replay.
+
+The events a window handles are saved with their frame numbers into a small binary log,
+their attributes as JSON, so logs load the same on every Python version,
+and fed back frame by frame later, to reproduce a bug or to benchmark a scene with the same input every time.
+
+Such as:
+
+>>> import easyplayer as ep
+>>> window = ep.Window()
+>>> window.start_recording('play.epev')
+>>> window.show()
+
+>>> window = ep.Window(headless=True)
+>>> profiler = window.enable_profiler()
+>>> window.replay('play.epev', fast=True)
+>>> print(profiler.report())
+"""
+
+import json
+import struct
+from typing import BinaryIO, Dict, List, Tuple
+
+import pygame
+from pygame import constants
+
+from easyplayer.exceptions import EasyPlayerReplayError
+
+__all__ = ['EventRecorder', 'EventReplay']
+
+MAGIC = b'EPEV'
+VERSION = 2   # Version 1 saved attributes with marshal
+_HEADER = struct.Struct('<4sH')
+_RECORD = struct.Struct('<IIH')   # Frame, event type, attribute size
+_SIMPLE = (int, float, str, bool, type(None))
+
+
+def _plain(value):
+    """
+    Check whether a value can be saved, such as numbers, strings and tuples of them.
+
+    :param value: The value.
+    :return: Whether it can be saved.
+    """
+    if isinstance(value, _SIMPLE):
+        return True
+    if isinstance(value, (tuple, list)):
+        return all(_plain(item) for item in value)
+    return False
+
+
+def _tuples(value):
+    """
+    Turn the lists of a loaded JSON value back into tuples, such as event positions.
+
+    :param value: The value.
+    :return: The value with tuples.
+    """
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    return value
+
+
+class EventRecorder(object):
+    def __init__(self, path: str):
+        """
+        Easy Player event recorder.
+
+        Saves events with the frame they were handled in, relative to the first recorded frame.
+        Attributes that are not numbers, strings or tuples of them, such as window objects, are dropped.
+
+        :param path: Log path.
+        """
+        self._path = path
+        self._file: BinaryIO = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+        self._start = None
+        self._last = 0
+        self.count = 0
+
+    def __str__(self):
+        return f'EventRecorder(path={self._path!r}, events={self.count})'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def write(self, frame: int, events: List[pygame.event.Event]):
+        """
+        Save the events of a frame.
+
+        :param frame: Window frame number.
+        :param events: Pygame events.
+        :return: None
+        """
+        if self._start is None:
+            self._start = frame
+        frame = self._last = frame - self._start
+        for event in events:
+            attrs = {key: value for key, value in event.dict.items() if _plain(value)}
+            data = json.dumps(attrs, separators=(',', ':')).encode('utf-8')
+            self._file.write(_RECORD.pack(frame, event.type, len(data)))
+            self._file.write(data)
+            self.count += 1
+
+    def close(self):
+        """
+        Flush and close the log.
+
+        The last recorded frame is saved, so that replays run as many frames even if it has no event.
+
+        :return: None
+        """
+        if not self._file.closed:
+            self._file.write(_RECORD.pack(self._last, constants.NOEVENT, 0))
+            self._file.close()
+
+
+class _HeldKeys(object):
+    """
+    Held keys, indexed by key code like pygame.key.get_pressed().
+    """
+    def __init__(self, held: frozenset):
+        self._held = held
+
+    def __getitem__(self, item):
+        return item in self._held
+
+
+class EventReplay(object):
+    def __init__(self, path: str):
+        """
+        Easy Player event replay.
+
+        Loads a log saved by EventRecorder and gives back the events of every frame.
+        Recorded quit events are skipped, the replay ends after the last recorded frame instead.
+        The held keys, mouse buttons and mouse position are rebuilt from the events for Window.input.
+
+        :param path: Log path.
+        """
+        self._path = path
+        self._frames: Dict[int, List[pygame.event.Event]] = {}
+        self.count = 0
+        self.length = 0
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise EasyPlayerReplayError(f'Not an event log: {path!r}')
+        magic, version = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise EasyPlayerReplayError(f'Not an event log: {path!r}')
+        if version != VERSION:
+            raise EasyPlayerReplayError(f'Unsupported event log version: {version}')
+        offset = _HEADER.size
+        while offset < len(data):
+            frame, event_type, size = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            attrs = {key: _tuples(value) for key, value in json.loads(data[offset:offset + size]).items()} if size else {}
+            offset += size
+            self.length = frame + 1
+            if event_type in (constants.QUIT, constants.NOEVENT):   # NOEVENT marks the last frame
+                continue
+            self._frames.setdefault(frame, []).append(pygame.event.Event(event_type, attrs))
+            self.count += 1
+        self._frame = 0
+        self._held = set()
+        self._buttons = [False] * 5
+        self._pos = (0, 0)
+
+    def __str__(self):
+        return f'EventReplay(path={self._path!r}, frames={self.length}, events={self.count})'
+
+    @property
+    def done(self):
+        """
+        Whether all recorded frames are given back.
+        """
+        return self._frame >= self.length
+
+    def next_frame(self):
+        """
+        Get the events of the next frame.
+
+        :return: A list of pygame events.
+        """
+        events = self._frames.get(self._frame, [])
+        self._frame += 1
+        for event in events:
+            if event.type == constants.KEYDOWN:
+                self._held.add(event.key)
+            elif event.type == constants.KEYUP:
+                self._held.discard(event.key)
+            elif event.type in (constants.MOUSEBUTTONDOWN, constants.MOUSEBUTTONUP):
+                if 1 <= event.button <= 5:
+                    self._buttons[event.button - 1] = event.type == constants.MOUSEBUTTONDOWN
+                self._pos = event.pos
+            elif event.type == constants.MOUSEMOTION:
+                self._pos = event.pos
+        return events
+
+    def state(self) -> Tuple[_HeldKeys, Tuple[bool, ...], Tuple[int, int]]:
+        """
+        Get the input state after the events given so far.
+
+        :return: Held keys, held mouse buttons and mouse position, the arguments of Input.update.
+        """
+        return _HeldKeys(frozenset(self._held)), tuple(self._buttons), self._pos
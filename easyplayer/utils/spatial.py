@@ -0,0 +1,230 @@
+"""
+Easy Player spatial index tools.
+
+A uniform grid that finds the sprites near a rect without testing every sprite.
+
+Such as:
+
+>>> import easyplayer as ep
+>>> index = ep.SpatialHash(cell_size=64)
+>>> index.add(sprite)
+>>> sprite.x += 10
+>>> index.update(sprite)
+>>> index.query_rect((0, 0, 100, 100))
+"""
+
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+
+import pygame
+
+__all__ = ['SpatialHash']
+
+RectType = Union[pygame.Rect, Tuple[int, int, int, int]]
+
+
+class SpatialHash(object):
+    def __init__(self, cell_size: int = 64):
+        """
+        Easy Player spatial hash.
+
+        Sprites are stored in the grid cells their rect covers.
+        Call update when a sprite moves, only sprites that left their cells are moved in the grid.
+
+        :param cell_size: The width and height of a grid cell.
+        """
+        self._cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[pygame.sprite.Sprite]] = {}
+        self._bounds: Dict[pygame.sprite.Sprite, Tuple[int, int, int, int]] = {}
+        self._order: Dict[pygame.sprite.Sprite, int] = {}
+        self._count = 0
+
+    def __str__(self):
+        return f'SpatialHash(cell_size={self._cell_size}, sprites={len(self)})'
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, sprite: pygame.sprite.Sprite):
+        return sprite in self._bounds
+
+    def __iter__(self):
+        return iter(self._bounds)
+
+    @property
+    def cell_size(self):
+        return self._cell_size
+
+    def _cell_range(self, rect: RectType):
+        """
+        Get the cells a rect covers.
+
+        :param rect: The rect.
+        :return: Left, top, right and bottom cell, inclusive.
+        """
+        x, y, w, h = rect
+        size = self._cell_size
+        return x // size, y // size, (x + max(w, 1) - 1) // size, (y + max(h, 1) - 1) // size
+
+    def _link(self, sprite: pygame.sprite.Sprite, bounds: Tuple[int, int, int, int]):
+        """
+        Put a sprite in cells.
+
+        :param sprite: The sprite.
+        :param bounds: Cell range.
+        :return: None
+        """
+        x0, y0, x1, y1 = bounds
+        cells = self._cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cell = cells[cx, cy] = set()
+                cell.add(sprite)
+
+    def _unlink(self, sprite: pygame.sprite.Sprite, bounds: Tuple[int, int, int, int]):
+        """
+        Take a sprite out of cells.
+
+        :param sprite: The sprite.
+        :param bounds: Cell range.
+        :return: None
+        """
+        x0, y0, x1, y1 = bounds
+        cells = self._cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells[cx, cy]
+                cell.discard(sprite)
+                if not cell:
+                    del cells[cx, cy]
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """
+        Add a sprite, or update it if it has been added.
+
+        :param sprite: The sprite.
+        :return: None
+        """
+        self.update(sprite)
+
+    def update(self, sprite: pygame.sprite.Sprite):
+        """
+        Move a sprite to the cells its rect covers now.
+
+        :param sprite: The sprite.
+        :return: None
+        """
+        bounds = self._cell_range(sprite.rect)
+        old = self._bounds.get(sprite)
+        if old == bounds:
+            return
+        if old is None:
+            self._order[sprite] = self._count
+            self._count += 1
+        else:
+            self._unlink(sprite, old)
+        self._link(sprite, bounds)
+        self._bounds[sprite] = bounds
+
+    def update_all(self, sprites: Optional[Iterable[pygame.sprite.Sprite]] = None):
+        """
+        Update sprites, all sprites in this index by default.
+
+        :param sprites: The sprites.
+        :return: None
+        """
+        for sprite in (list(self._bounds) if sprites is None else sprites):
+            self.update(sprite)
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """
+        Remove a sprite if it is in this index.
+
+        :param sprite: The sprite.
+        :return: None
+        """
+        bounds = self._bounds.pop(sprite, None)
+        if bounds is not None:
+            self._unlink(sprite, bounds)
+            del self._order[sprite]
+
+    def clear(self):
+        """
+        Remove all sprites.
+
+        :return: None
+        """
+        self._cells.clear()
+        self._bounds.clear()
+        self._order.clear()
+
+    def _candidates(self, rect: RectType):
+        """
+        Get the sprites in the cells a rect covers.
+
+        :param rect: The rect.
+        :return: A set of sprites.
+        """
+        x0, y0, x1, y1 = self._cell_range(rect)
+        cells = self._cells
+        res = set()
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):   # Fewer cells in use than covered
+            for (cx, cy), cell in cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    res.update(cell)
+            return res
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    res.update(cell)
+        return res
+
+    def _sorted(self, sprites: Iterable[pygame.sprite.Sprite]):
+        """
+        Sort sprites in the order they were added.
+
+        :param sprites: The sprites.
+        :return: A list of sprites.
+        """
+        return sorted(sprites, key=self._order.__getitem__)
+
+    def query_rect(self, rect: RectType):
+        """
+        Find sprites whose rect collides with a rect.
+
+        :param rect: The rect.
+        :return: A list of sprites, in the order they were added.
+        """
+        rect = pygame.Rect(rect)
+        return self._sorted(s for s in self._candidates(rect) if rect.colliderect(s.rect))
+
+    def query_radius(self, center: Tuple[float, float], radius: float):
+        """
+        Find sprites whose rect collides with a circle.
+
+        :param center: The center of the circle.
+        :param radius: The radius of the circle.
+        :return: A list of sprites, in the order they were added.
+        """
+        x, y = center
+        rect = pygame.Rect(int(x - radius), int(y - radius), int(radius * 2) + 2, int(radius * 2) + 2)
+        square = radius * radius
+        res = []
+        for sprite in self._candidates(rect):
+            r = sprite.rect
+            dx = x - max(r.left, min(x, r.right))
+            dy = y - max(r.top, min(y, r.bottom))
+            if dx * dx + dy * dy <= square:
+                res.append(sprite)
+        return self._sorted(res)
+
+    def query_sprite(self, sprite: pygame.sprite.Sprite):
+        """
+        Find sprites whose rect collides with a sprite's rect, excluding the sprite itself.
+
+        :param sprite: The sprite.
+        :return: A list of sprites, in the order they were added.
+        """
+        return [s for s in self.query_rect(sprite.rect) if s is not sprite]